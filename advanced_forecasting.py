@@ -6,87 +6,240 @@ Implements all user requirements for enhanced forecasting capabilities
 import streamlit as st
 import pandas as pd
 import numpy as np
-import plotly.graph_objects as go
-from plotly.subplots import make_subplots
 from datetime import datetime, timedelta, time
 import pytz
-from forecasting import StockForecaster
-from data_fetcher import DataFetcher
 import requests
-from bs4 import BeautifulSoup
+from requests.adapters import HTTPAdapter
 import re
 import io
+import csv
+import threading
+from types import MappingProxyType
+from concurrent.futures import ThreadPoolExecutor, as_completed, TimeoutError as FuturesTimeoutError
+
+# Base prices for major companies, used to seed simulated data
+_BASE_PRICES = MappingProxyType({
+    'KSE-100': 132920, 'OGDC': 195, 'LUCK': 1150, 'PSO': 245, 'HBL': 146,
+    'MCB': 276, 'UBL': 195, 'ENGRO': 316, 'FFC': 145, 'MARI': 1950,
+    'TRG': 145, 'BAFL': 351, 'BAHL': 66, 'FFBL': 285, 'KAPCO': 46,
+    'AKBL': 196, 'CHCC': 185, 'DGKC': 126, 'ABOT': 855, 'AGP': 96,
+    'AIRLINK': 146, 'APL': 1250, 'ASTL': 185, 'COLG': 2850, 'EFUG': 245,
+    'FHAM': 185, 'GATM': 26, 'GHGL': 35, 'HABSM': 155, 'HASCOL': 15,
+    'HGFA': 125, 'HUBC': 126, 'JLICL': 485, 'KTMLM': 385, 'LOADS': 16,
+    'MLCF': 65, 'MUGHAL': 85, 'NCPL': 65, 'PACE': 8, 'PAEL': 45,
+    'PIBTL': 12, 'PIOC': 185, 'POWER': 6, 'SAZEW': 15, 'SEARL': 155,
+    'SHEL': 145, 'SNGP': 56, 'SSGC': 23, 'TOMCL': 36, 'TPLP': 16,
+    'UNITY': 35, 'WTL': 2, 'YOUW': 3, 'ZAHID': 485, 'MEBL': 196,
+    'NBP': 48, 'SCBPL': 285, 'FABL': 65, 'SILK': 1, 'GTYR': 15,
+    'TELE': 2, 'CSAP': 8, 'PRWM': 16, 'PAKT': 25, 'CLCPS': 35,
+    'DAWH': 155, 'EPCL': 45, 'FEROZ': 1, 'FNEL': 16, 'IGIHL': 285,
+    'INDU': 1850, 'JKSM': 95, 'KPUS': 185, 'MUREB': 485, 'NATF': 185,
+    'NESTLE': 6500, 'PNSC': 15, 'PKGS': 485, 'PMPK': 125, 'RMPL': 245,
+    'SAPT': 885, 'SIEM': 685, 'THALL': 485, 'TPPL': 16, 'TMSF': 2,
+    'TREET': 35, 'UPFL': 16, 'WAHN': 2, 'CPPL': 35, 'DFML': 485,
+    'GADT': 35, 'HINOON': 185
+})
+
+# Symbol to Investing.com slug
+_INVESTING_SYMBOL_MAP = MappingProxyType({
+    'KSE-100': 'pakistan-kse-100',
+    'OGDC': 'ogdc',
+    'LUCK': 'lucky-cement',
+    'PSO': 'pakistan-state-oil',
+    'HBL': 'habib-bank-limited',
+    'MCB': 'mcb-bank',
+    'UBL': 'united-bank-limited',
+    'ENGRO': 'engro-corporation',
+    'FFC': 'fauji-fertilizer',
+    'MARI': 'mari-petroleum'
+})
+
+# Investing.com request headers, set once as the scraper session defaults
+_INVESTING_HEADERS = MappingProxyType({
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
+    'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
+    'Accept-Language': 'en-US,en;q=0.5',
+    'Accept-Encoding': 'gzip, deflate, br',
+    'DNT': '1',
+    'Connection': 'keep-alive',
+    'Upgrade-Insecure-Requests': '1'
+})
+
+# Investing.com price selectors, most specific first; generic class selectors last
+_INVESTING_SELECTORS = (
+    'span[data-test="instrument-price-last"]',
+    '[data-test="instrument-price-last"]',
+    '.instrument-price_last__KQzyA',
+    'span.last-price-value',
+    'div.text-5xl',
+    '.text-2xl.font-bold',
+    'span.text-2xl'
+)
+
+# Yahoo Finance header overrides on top of the session defaults (hashable for the page cache)
+_YAHOO_HEADER_ITEMS = (
+    ('User-Agent', 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'),
+    ('Accept', 'text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8')
+)
+
+# Yahoo Finance price selectors, most specific first (attribute forms instead of escaped class names)
+_YAHOO_SELECTORS = (
+    'fin-streamer[data-field="regularMarketPrice"]',
+    'span[data-reactid*="price"]',
+    'div[data-field="regularMarketPrice"]',
+    'fin-streamer[class~="Fw(b)"]',
+    '[class~="Trsdu(0.3s)"]'
+)
+
+# Price with optional thousands separators, e.g. 1,234.56
+_PRICE_RE = re.compile(r'\d[\d,]*(?:\.\d+)?')
+
+# Common upload column names mapped to standard OHLCV names
+_COLUMN_MAPPING = {
+    'date': ['date', 'timestamp', 'time', 'datetime'],
+    'open': ['open', 'opening', 'open_price'],
+    'high': ['high', 'highest', 'high_price'],
+    'low': ['low', 'lowest', 'low_price'],
+    'close': ['close', 'closing', 'close_price', 'price'],
+    'volume': ['volume', 'vol', 'quantity']
+}
+_COLUMN_ALIASES = MappingProxyType({
+    alias: standard_name
+    for standard_name, aliases in _COLUMN_MAPPING.items()
+    for alias in aliases
+})
+
+# Scraped pages are reused for this many seconds
+_PAGE_CACHE_SECONDS = 10
+
+# Uploads above this size are parsed in row chunks
+_LARGE_UPLOAD_BYTES = 50 * 1024 * 1024
+_UPLOAD_CHUNK_ROWS = 50000
+
+# Seconds a live-price lookup waits for its sources
+_LIVE_LOOKUP_TIMEOUT = 15
+
+# get_live_prices looks up this many symbols at once, each fanning out to its sources
+_LIVE_SYMBOL_WORKERS = 8
+_LIVE_SOURCE_COUNT = 3
+
+@st.cache_resource
+def _get_symbol_executor():
+    """Shared pool for per-symbol live-price lookups, kept warm across reruns"""
+    return ThreadPoolExecutor(max_workers=_LIVE_SYMBOL_WORKERS, thread_name_prefix='psxsym')
+
+@st.cache_resource
+def _get_source_executor():
+    """Shared pool for per-source lookups, sized so a full symbol fan-out never queues"""
+    return ThreadPoolExecutor(max_workers=_LIVE_SYMBOL_WORKERS * _LIVE_SOURCE_COUNT,
+                              thread_name_prefix='psxsrc')
+
+def _is_known_column(name):
+    """Whether an uploaded column header maps to a standard OHLCV name"""
+    return str(name).strip().lower() in _COLUMN_ALIASES
+
+@st.cache_data(max_entries=8, show_spinner=False)
+def _read_uploaded_table(file_name, file_bytes):
+    """Parse uploaded CSV/Excel bytes, reading only the recognised OHLCV columns"""
+    if file_name.endswith('.csv'):
+        if len(file_bytes) > _LARGE_UPLOAD_BYTES:
+            # Stream large files in row chunks so only the kept columns accumulate
+            reader = pd.read_csv(io.BytesIO(file_bytes), usecols=_is_known_column, chunksize=_UPLOAD_CHUNK_ROWS)
+            return pd.concat(reader, ignore_index=True)
+        
+        # The pyarrow engine needs usecols as a list, so pick them from the header line
+        header_line = file_bytes.split(b'\n', 1)[0].decode('utf-8-sig', errors='ignore')
+        header = next(csv.reader([header_line]), [])
+        usecols = [col for col in header if _is_known_column(col)] or None
+        try:
+            # Multithreaded Arrow parser; fall back to the default engine if unavailable
+            return pd.read_csv(io.BytesIO(file_bytes), engine='pyarrow', usecols=usecols)
+        except Exception:
+            return pd.read_csv(io.BytesIO(file_bytes), usecols=_is_known_column)
+    return pd.read_excel(io.BytesIO(file_bytes), usecols=_is_known_column)
+
+@st.cache_data(max_entries=32, show_spinner=False)
+def _cached_forecast(_forecaster, brand, historical_data, days_ahead):
+    """Forecast memoized on (brand, data contents, horizon) so repeat clicks skip the fit"""
+    return _forecaster.forecast_stock(historical_data, days_ahead=days_ahead)
+
+def _date_mask(dates, target_date):
+    """Boolean mask for datetimes falling on target_date, as a half-open range comparison"""
+    start = pd.Timestamp(target_date).tz_localize(dates.dt.tz)
+    end = start + pd.Timedelta(days=1)
+    return (dates >= start) & (dates < end)
+
+def _first_index_on_date(sorted_dates, target_date):
+    """Position of the first datetime on target_date in a sorted series, or None"""
+    start = pd.Timestamp(target_date).tz_localize(sorted_dates.dt.tz)
+    idx = sorted_dates.searchsorted(start)
+    if idx < len(sorted_dates) and sorted_dates.iat[idx] < start + pd.Timedelta(days=1):
+        return idx
+    return None
 
 class AdvancedForecaster:
     """Advanced forecasting with time range selection and brand file upload"""
     
-    def __init__(self):
-        self.forecaster = StockForecaster()
-        self.data_fetcher = DataFetcher()
+    def __init__(self, forecaster=None, data_fetcher=None):
+        # Reuse existing components when the app already created them
+        from forecasting import StockForecaster
+        from data_fetcher import DataFetcher
+        self.forecaster = forecaster if forecaster is not None else StockForecaster()
+        self.data_fetcher = data_fetcher if data_fetcher is not None else DataFetcher()
         self.pkt_timezone = pytz.timezone('Asia/Karachi')
+        self.rng = np.random.default_rng()
+        
+        # Shared HTTP session so repeat scrapes reuse pooled keep-alive connections
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=10, pool_maxsize=20)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+        self.session.headers.update(_INVESTING_HEADERS)
+        
+        # Parsed pages by URL: (fetched_at, tree), reused for _PAGE_CACHE_SECONDS;
+        # scrapers run on lookup workers, so reads and writes go through the lock
+        self._page_cache = {}
+        self._page_cache_lock = threading.Lock()
         
     def generate_simulated_data(self, symbol, days=30):
         """Generate realistic simulated data for any KSE-100 company"""
         try:
-            # Base prices for major companies
-            base_prices = {
-                'KSE-100': 132920, 'OGDC': 195, 'LUCK': 1150, 'PSO': 245, 'HBL': 146,
-                'MCB': 276, 'UBL': 195, 'ENGRO': 316, 'FFC': 145, 'MARI': 1950,
-                'TRG': 145, 'BAFL': 351, 'BAHL': 66, 'FFBL': 285, 'KAPCO': 46,
-                'AKBL': 196, 'CHCC': 185, 'DGKC': 126, 'ABOT': 855, 'AGP': 96,
-                'AIRLINK': 146, 'APL': 1250, 'ASTL': 185, 'COLG': 2850, 'EFUG': 245,
-                'FHAM': 185, 'GATM': 26, 'GHGL': 35, 'HABSM': 155, 'HASCOL': 15,
-                'HGFA': 125, 'HUBC': 126, 'JLICL': 485, 'KTMLM': 385, 'LOADS': 16,
-                'MLCF': 65, 'MUGHAL': 85, 'NCPL': 65, 'PACE': 8, 'PAEL': 45,
-                'PIBTL': 12, 'PIOC': 185, 'POWER': 6, 'SAZEW': 15, 'SEARL': 155,
-                'SHEL': 145, 'SNGP': 56, 'SSGC': 23, 'TOMCL': 36, 'TPLP': 16,
-                'UNITY': 35, 'WTL': 2, 'YOUW': 3, 'ZAHID': 485, 'MEBL': 196,
-                'NBP': 48, 'SCBPL': 285, 'FABL': 65, 'SILK': 1, 'GTYR': 15,
-                'TELE': 2, 'CSAP': 8, 'PRWM': 16, 'PAKT': 25, 'CLCPS': 35,
-                'DAWH': 155, 'EPCL': 45, 'FEROZ': 1, 'FNEL': 16, 'IGIHL': 285,
-                'INDU': 1850, 'JKSM': 95, 'KPUS': 185, 'MUREB': 485, 'NATF': 185,
-                'NESTLE': 6500, 'PNSC': 15, 'PKGS': 485, 'PMPK': 125, 'RMPL': 245,
-                'SAPT': 885, 'SIEM': 685, 'THALL': 485, 'TPPL': 16, 'TMSF': 2,
-                'TREET': 35, 'UPFL': 16, 'WAHN': 2, 'CPPL': 35, 'DFML': 485,
-                'GADT': 35, 'HINOON': 185
-            }
-            
             # Get base price or use default
-            base_price = base_prices.get(symbol, 100)
+            base_price = _BASE_PRICES.get(symbol, 100)
             
             # Generate date range
             dates = pd.date_range(end=datetime.now(), periods=days, freq='D')
             
-            # Create realistic price data with volatility
-            prices = []
-            current_price = base_price
+            rng = self.rng
             
-            for i in range(days):
-                # Add realistic market volatility
-                volatility = np.random.normal(0, 0.02)  # 2% daily volatility
-                
-                # Market trend factor
-                trend_factor = np.sin(i * 0.1) * 0.01  # Cyclical trend
-                
-                # Price change
-                price_change = current_price * (volatility + trend_factor)
-                current_price = max(current_price + price_change, base_price * 0.5)  # Minimum 50% of base
-                
-                # Generate OHLC data
-                high = current_price * (1 + abs(np.random.normal(0, 0.01)))
-                low = current_price * (1 - abs(np.random.normal(0, 0.01)))
-                open_price = current_price * (1 + np.random.normal(0, 0.005))
-                
-                prices.append({
-                    'date': dates[i],
-                    'open': round(open_price, 2),
-                    'high': round(high, 2),
-                    'low': round(low, 2),
-                    'close': round(current_price, 2),
-                    'volume': int(np.random.uniform(50000, 500000))
-                })
+            # Daily factors: 2% volatility plus a cyclical trend
+            volatility = rng.normal(0, 0.02, days)
+            trend_factor = np.sin(np.arange(days) * 0.1) * 0.01
+            log_steps = np.cumsum(np.log1p(volatility + trend_factor))
+            
+            # Random walk with a floor at 50% of base, solved in log space:
+            # log(close_n) = S_n + max(log(base), log(floor) - min(S_1..S_n))
+            floor_price = base_price * 0.5
+            close = np.exp(log_steps + np.maximum(
+                np.log(base_price),
+                np.log(floor_price) - np.minimum.accumulate(log_steps)
+            ))
             
-            return pd.DataFrame(prices)
+            # Generate OHLC data
+            high = close * (1 + np.abs(rng.normal(0, 0.01, days)))
+            low = close * (1 - np.abs(rng.normal(0, 0.01, days)))
+            open_price = close * (1 + rng.normal(0, 0.005, days))
+            volume = rng.integers(50000, 500000, days, dtype=np.int32)
+            
+            # Columns go straight in as arrays (no per-row records)
+            return pd.DataFrame({
+                'date': dates,
+                'open': np.round(open_price, 2),
+                'high': np.round(high, 2),
+                'low': np.round(low, 2),
+                'close': np.round(close, 2),
+                'volume': volume
+            })
             
         except Exception as e:
             st.error(f"Error generating simulated data: {e}")
@@ -114,66 +267,58 @@ class AdvancedForecaster:
             simulated_data = self.generate_simulated_data(symbol)
             return simulated_data, 'simulated'
         
+    @st.cache_data(ttl=300, show_spinner=False)  # Keyed on (symbol, date_str) so entries roll over daily
+    def get_cached_data_with_fallback(_self, symbol, date_str):
+        """Cached get_data_with_fallback for interactive reruns on the same trading day"""
+        return _self.get_data_with_fallback(symbol)
+        
+    def _fetch_parsed_page(self, url, timeout, headers=None):
+        """Fetch and parse a page through the shared session, reusing recent results"""
+        from selectolax.parser import HTMLParser
+        
+        now = datetime.now().timestamp()
+        with self._page_cache_lock:
+            cached = self._page_cache.get(url)
+        if cached is not None and now - cached[0] < _PAGE_CACHE_SECONDS:
+            return cached[1]
+        
+        response = self.session.get(url, headers=dict(headers) if headers else None, timeout=timeout)
+        tree = HTMLParser(response.text) if response.status_code == 200 else None
+        
+        with self._page_cache_lock:
+            # Drop stale pages so the cache only ever holds the last few seconds of scrapes
+            stale = [key for key, entry in self._page_cache.items() if now - entry[0] >= _PAGE_CACHE_SECONDS]
+            for key in stale:
+                del self._page_cache[key]
+            self._page_cache[url] = (now, tree)
+        return tree
+        
     def scrape_live_prices_investing_com(self, symbol):
         """Scrape live prices from Investing.com"""
         try:
             # Convert symbol to Investing.com format
-            symbol_map = {
-                'KSE-100': 'pakistan-kse-100',
-                'OGDC': 'ogdc',
-                'LUCK': 'lucky-cement',
-                'PSO': 'pakistan-state-oil',
-                'HBL': 'habib-bank-limited',
-                'MCB': 'mcb-bank',
-                'UBL': 'united-bank-limited',
-                'ENGRO': 'engro-corporation',
-                'FFC': 'fauji-fertilizer',
-                'MARI': 'mari-petroleum'
-            }
-            
-            investing_symbol = symbol_map.get(symbol, symbol.lower())
+            investing_symbol = _INVESTING_SYMBOL_MAP.get(symbol, symbol.lower())
             url = f"https://www.investing.com/equities/{investing_symbol}"
             
-            headers = {
-                'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
-                'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
-                'Accept-Language': 'en-US,en;q=0.5',
-                'Accept-Encoding': 'gzip, deflate, br',
-                'DNT': '1',
-                'Connection': 'keep-alive',
-                'Upgrade-Insecure-Requests': '1'
-            }
-            
-            response = requests.get(url, headers=headers, timeout=15)
-            if response.status_code == 200:
-                soup = BeautifulSoup(response.content, 'html.parser')
-                
-                # Multiple selectors for price extraction
-                price_selectors = [
-                    'span[data-test="instrument-price-last"]',
-                    'span.text-2xl',
-                    'div.text-5xl',
-                    'span.last-price-value',
-                    '[data-test="instrument-price-last"]',
-                    '.instrument-price_last__KQzyA',
-                    '.text-2xl.font-bold'
-                ]
-                
-                for selector in price_selectors:
-                    elements = soup.select(selector)
-                    for element in elements:
-                        text = element.get_text(strip=True)
-                        # Extract price from text
-                        price_match = re.search(r'[\d,]+\.?\d*', text.replace(',', ''))
-                        if price_match:
-                            price = float(price_match.group())
-                            if symbol == 'KSE-100' and 80000 <= price <= 150000:
-                                return {'price': price, 'source': 'investing.com', 'timestamp': datetime.now()}
-                            elif symbol != 'KSE-100' and 1 <= price <= 10000:
-                                return {'price': price, 'source': 'investing.com', 'timestamp': datetime.now()}
+            tree = self._fetch_parsed_page(url, timeout=15)
+            if tree is not None:
+                # Check only the first node per selector and stop at the first valid price
+                for selector in _INVESTING_SELECTORS:
+                    node = tree.css_first(selector)
+                    if node is None:
+                        continue
+                    # Extract price from text
+                    price_match = _PRICE_RE.search(node.text(strip=True))
+                    if price_match:
+                        price = float(price_match.group().replace(',', ''))
+                        if symbol == 'KSE-100' and 80000 <= price <= 150000:
+                            return {'price': price, 'source': 'investing.com', 'timestamp': datetime.now()}
+                        elif symbol != 'KSE-100' and 1 <= price <= 10000:
+                            return {'price': price, 'source': 'investing.com', 'timestamp': datetime.now()}
                                 
         except Exception as e:
-            st.warning(f"Investing.com scraping failed: {e}")
+            # Runs on a lookup worker, so the caller reports it on the script thread
+            raise RuntimeError(f"Investing.com scraping failed: {e}") from e
             
         return None
     
@@ -184,59 +329,84 @@ class AdvancedForecaster:
             yahoo_symbol = f"{symbol}.KAR" if symbol != 'KSE-100' else '^KSE100'
             url = f"https://finance.yahoo.com/quote/{yahoo_symbol}"
             
-            headers = {
-                'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36',
-                'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8'
-            }
-            
-            response = requests.get(url, headers=headers, timeout=10)
-            if response.status_code == 200:
-                soup = BeautifulSoup(response.content, 'html.parser')
-                
-                # Yahoo Finance price selectors
-                price_selectors = [
-                    'fin-streamer[data-field="regularMarketPrice"]',
-                    'span[data-reactid*="price"]',
-                    'div[data-field="regularMarketPrice"]',
-                    'fin-streamer.Fw\\(b\\)',
-                    '.Trsdu\\(0\\.3s\\)'
-                ]
-                
-                for selector in price_selectors:
-                    elements = soup.select(selector)
-                    for element in elements:
-                        text = element.get_text(strip=True)
-                        price_match = re.search(r'[\d,]+\.?\d*', text.replace(',', ''))
-                        if price_match:
-                            price = float(price_match.group())
-                            return {'price': price, 'source': 'yahoo_finance', 'timestamp': datetime.now()}
+            tree = self._fetch_parsed_page(url, timeout=10, headers=_YAHOO_HEADER_ITEMS)
+            if tree is not None:
+                for selector in _YAHOO_SELECTORS:
+                    node = tree.css_first(selector)
+                    if node is None:
+                        continue
+                    price_match = _PRICE_RE.search(node.text(strip=True))
+                    if price_match:
+                        price = float(price_match.group().replace(',', ''))
+                        return {'price': price, 'source': 'yahoo_finance', 'timestamp': datetime.now()}
                             
         except Exception as e:
-            st.warning(f"Yahoo Finance scraping failed: {e}")
+            # Runs on a lookup worker, so the caller reports it on the script thread
+            raise RuntimeError(f"Yahoo Finance scraping failed: {e}") from e
             
         return None
     
-    def get_comprehensive_live_price(self, symbol):
-        """Get live price from multiple sources"""
+    @st.cache_data(ttl=30, show_spinner=False)  # Reuse live prices across reruns for 30 seconds
+    def _lookup_live_price(_self, symbol):
+        """First valid price from the live sources; raises LookupError so misses are never cached"""
         sources = [
-            self.scrape_live_prices_investing_com,
-            self.scrape_live_prices_yahoo_finance,
-            self.data_fetcher.get_live_psx_price
+            _self.scrape_live_prices_investing_com,
+            _self.scrape_live_prices_yahoo_finance,
+            _self.data_fetcher.get_live_psx_price
         ]
         
-        for source_func in sources:
-            try:
-                result = source_func(symbol)
+        # Sources run on their own pool, so they never queue behind the symbol lookups waiting on them
+        executor = _get_source_executor()
+        futures = [executor.submit(source_func, symbol) for source_func in sources]
+        errors = []
+        try:
+            for future in as_completed(futures, timeout=_LIVE_LOOKUP_TIMEOUT):
+                try:
+                    result = future.result()
+                except Exception as e:
+                    errors.append(str(e))
+                    continue
                 if result and 'price' in result:
                     return result
-            except:
-                continue
-                
-        # Fallback to realistic estimation
+        except FuturesTimeoutError:
+            errors.append(f"Live price lookup for {symbol} timed out after {_LIVE_LOOKUP_TIMEOUT}s")
+        finally:
+            # Don't block on slower sources once we have an answer
+            for future in futures:
+                future.cancel()
+        raise LookupError(symbol, errors)
+    
+    def _estimated_live_price(self, symbol, lookup_error):
+        """Report source errors on the script thread and fall back to a realistic estimate"""
+        for message in lookup_error.args[1]:
+            st.warning(message)
         if symbol == 'KSE-100':
-            return {'price': 128000 + np.random.uniform(-2000, 2000), 'source': 'estimate', 'timestamp': datetime.now()}
+            return {'price': 128000 + self.rng.uniform(-2000, 2000), 'source': 'estimate', 'timestamp': datetime.now()}
         else:
-            return {'price': 100 + np.random.uniform(-20, 20), 'source': 'estimate', 'timestamp': datetime.now()}
+            return {'price': 100 + self.rng.uniform(-20, 20), 'source': 'estimate', 'timestamp': datetime.now()}
+    
+    def get_comprehensive_live_price(self, symbol):
+        """Get live price from multiple sources"""
+        try:
+            return self._lookup_live_price(symbol)
+        except LookupError as e:
+            return self._estimated_live_price(symbol, e)
+    
+    def get_live_prices(self, symbols):
+        """Get live prices for several symbols concurrently, keyed by symbol"""
+        if not symbols:
+            return {}
+        # Symbol lookups and their source lookups use separate shared pools
+        executor = _get_symbol_executor()
+        futures = {symbol: executor.submit(self._lookup_live_price, symbol) for symbol in symbols}
+        
+        prices = {}
+        for symbol, future in futures.items():
+            try:
+                prices[symbol] = future.result()
+            except LookupError as e:
+                prices[symbol] = self._estimated_live_price(symbol, e)
+        return prices
     
     def generate_time_range_forecast(self, historical_data, start_time, end_time, forecast_date=None, symbol="KSE-100"):
         """Generate forecast for specific time range on selected date with 5-minute intervals"""
@@ -247,77 +417,43 @@ class AdvancedForecaster:
         end_datetime = datetime.combine(target_date, end_time)
         
         # Generate 5-minute intervals
-        time_points = []
-        current_time = start_datetime
-        
-        while current_time <= end_datetime:
-            time_points.append(current_time)
-            current_time += timedelta(minutes=5)
+        time_points = pd.date_range(start=start_datetime, end=end_datetime, freq='5min')
         
         # Get current live price
         live_data = self.get_comprehensive_live_price(symbol)
         current_price = live_data['price']
         
-        # Generate forecast data
-        forecast_data = []
-        base_price = current_price
-        
-        for i, time_point in enumerate(time_points):
-            # Create realistic price movement
-            volatility = 0.002  # 0.2% volatility per 5-min interval
-            trend = np.random.uniform(-0.002, 0.002)  # Slight trend
-            noise = np.random.normal(0, volatility)
-            
-            price_change = (trend + noise) * base_price
-            predicted_price = base_price + price_change
-            
-            # Confidence bounds
-            confidence_range = predicted_price * 0.01  # 1% confidence range
-            upper_bound = predicted_price + confidence_range
-            lower_bound = predicted_price - confidence_range
-            
-            forecast_data.append({
-                'ds': time_point,
-                'yhat': predicted_price,
-                'yhat_upper': upper_bound,
-                'yhat_lower': lower_bound
-            })
-            
-            base_price = predicted_price
+        # Generate forecast data as a cumulative random walk
+        n = len(time_points)
+        rng = self.rng
+        volatility = 0.002  # 0.2% volatility per 5-min interval
+        trend = rng.uniform(-0.002, 0.002, n)  # Slight trend
+        noise = rng.normal(0, volatility, n)
+        predicted_prices = current_price * np.cumprod(1 + trend + noise)
         
-        return pd.DataFrame(forecast_data)
+        # Confidence bounds (1% range)
+        return pd.DataFrame({
+            'ds': time_points,
+            'yhat': predicted_prices,
+            'yhat_upper': predicted_prices * 1.01,
+            'yhat_lower': predicted_prices * 0.99
+        })
     
     def process_uploaded_file_with_brand(self, uploaded_file, selected_brand):
         """Process uploaded file and integrate with live prices for selected brand"""
         try:
-            # Read uploaded file
-            if uploaded_file.name.endswith('.csv'):
-                df = pd.read_csv(uploaded_file)
-            elif uploaded_file.name.endswith('.xlsx'):
-                df = pd.read_excel(uploaded_file)
-            else:
+            # Read uploaded file (parsed once per upload, reused across reruns)
+            if not uploaded_file.name.endswith(('.csv', '.xlsx')):
                 st.error("Please upload CSV or Excel file")
                 return None
+            df = _read_uploaded_table(uploaded_file.name, uploaded_file.getvalue())
             
             # Standardize column names
             df.columns = df.columns.str.lower().str.strip()
             
-            # Map common column names
-            column_mapping = {
-                'date': ['date', 'timestamp', 'time', 'datetime'],
-                'open': ['open', 'opening', 'open_price'],
-                'high': ['high', 'highest', 'high_price'],
-                'low': ['low', 'lowest', 'low_price'],
-                'close': ['close', 'closing', 'close_price', 'price'],
-                'volume': ['volume', 'vol', 'quantity']
-            }
-            
-            # Rename columns
-            for standard_name, possible_names in column_mapping.items():
-                for col in df.columns:
-                    if col in possible_names:
-                        df = df.rename(columns={col: standard_name})
-                        break
+            # Rename common column names in one pass, keeping the first match per standard name
+            df = df.rename(columns=lambda col: _COLUMN_ALIASES.get(col, col))
+            df = df.loc[:, ~df.columns.duplicated()]
             
             # Ensure required columns exist
             required_columns = ['date', 'close']
@@ -359,10 +495,12 @@ class AdvancedForecaster:
                 'volume': df['volume'].mean() if 'volume' in df.columns else 1000000
             }
             
-            df = pd.concat([df, pd.DataFrame([new_row])], ignore_index=True)
-            
-            # Sort by date
+            # Sort by date, then append in place; the new row is always the latest date
             df = df.sort_values('date').reset_index(drop=True)
+            df.loc[len(df), list(new_row)] = list(new_row.values())
+            
+            # Volume tolerates float32; prices stay float64 so index-level values keep their decimals
+            df['volume'] = df['volume'].astype(np.float32)
             
             st.success(f"✅ File processed successfully! Integrated live price: {current_live_price:,.2f} PKR for {selected_brand}")
             st.info(f"📊 Data source: {live_data['source']} | Last updated: {live_data['timestamp'].strftime('%H:%M:%S PKT')}")
@@ -373,26 +511,20 @@ class AdvancedForecaster:
             st.error(f"Error processing file: {e}")
             return None
     
-    def generate_custom_date_forecast(self, historical_data, target_date, symbol="KSE-100"):
-        """Generate forecast for custom selected date"""
+    def generate_custom_date_forecast(self, historical_data, target_date, symbol="KSE-100", extended_forecast=None):
+        """Generate forecast for custom selected date, reusing extended_forecast when it is supplied"""
         try:
-            # Prepare data for Prophet
-            forecast_data = historical_data[['date', 'close']].copy()
-            forecast_data = forecast_data.rename(columns={'date': 'ds', 'close': 'y'})
+            # Calculate days difference
+            last_date = historical_data['date'].max()
+            days_diff = (target_date - last_date.date()).days
             
-            # Use Prophet for forecasting
-            forecast = self.forecaster.forecast_stock(historical_data, days_ahead=1)
-            
-            if forecast is not None and not forecast.empty:
-                # Calculate days difference
-                last_date = historical_data['date'].max()
-                days_diff = (target_date - last_date.date()).days
-                
-                if days_diff > 0:
-                    # Future date prediction
+            if days_diff > 0:
+                # Future date prediction - a single forecast run out to the target date
+                if extended_forecast is None:
                     extended_forecast = self.forecaster.forecast_stock(historical_data, days_ahead=days_diff)
-                    
-                    target_forecast = extended_forecast[extended_forecast['ds'].dt.date == target_date]
+                
+                if extended_forecast is not None and not extended_forecast.empty:
+                    target_forecast = extended_forecast[_date_mask(extended_forecast['ds'], target_date)]
                     
                     if not target_forecast.empty:
                         return target_forecast.iloc[-1]
@@ -400,44 +532,58 @@ class AdvancedForecaster:
                         # Extrapolate if exact date not found
                         last_prediction = extended_forecast.iloc[-1]
                         return last_prediction
-                else:
-                    # Historical date - return actual data if available
-                    historical_point = historical_data[historical_data['date'].dt.date == target_date]
-                    if not historical_point.empty:
-                        actual_data = historical_point.iloc[-1]
-                        return {
-                            'ds': actual_data['date'],
-                            'yhat': actual_data['close'],
-                            'yhat_lower': actual_data['close'] * 0.99,
-                            'yhat_upper': actual_data['close'] * 1.01,
-                            'type': 'historical'
-                        }
-                        
+            else:
+                # Historical date - return actual data if available
+                historical_point = historical_data[_date_mask(historical_data['date'], target_date)]
+                if not historical_point.empty:
+                    actual_data = historical_point.iloc[-1]
+                    return {
+                        'ds': actual_data['date'],
+                        'yhat': actual_data['close'],
+                        'yhat_lower': actual_data['close'] * 0.99,
+                        'yhat_upper': actual_data['close'] * 1.01,
+                        'type': 'historical'
+                    }
+                    
         except Exception as e:
             st.error(f"Error generating custom date forecast: {e}")
             
         return None
 
+# Plotly styling shared by the dashboard charts
+_HISTORICAL_LINE = dict(color='blue', width=2)
+_UPLOAD_FORECAST_LINE = dict(color='red', width=3, dash='dash')
+_CONNECTOR_LINE = dict(color='green', width=2, dash='dot')
+_CI_LINE = dict(color='rgba(255,255,255,0)')
+_DAILY_LAYOUT = dict(xaxis_title="Date", yaxis_title="Price (PKR)", height=500, showlegend=True)
+_INTRADAY_XAXIS = dict(
+    tickformat='%H:%M',
+    tickmode='linear',
+    dtick=15*60*1000  # Show tick every 15 minutes
+)
+
 def display_advanced_forecasting_dashboard():
     """Main dashboard for advanced forecasting features"""
+    import plotly.graph_objects as go
     
     st.title("🚀 Advanced PSX Forecasting Dashboard")
     st.markdown("**Complete forecasting solution with time range selection, brand file upload, and live price integration**")
     
     # Initialize forecaster and session state
     if 'advanced_forecaster' not in st.session_state:
-        st.session_state.advanced_forecaster = AdvancedForecaster()
+        st.session_state.advanced_forecaster = AdvancedForecaster(
+            forecaster=st.session_state.get('forecaster'),
+            data_fetcher=st.session_state.get('data_fetcher')
+        )
     
     forecaster = st.session_state.advanced_forecaster
     
-    # Initialize data fetcher and other components
+    # Share the advanced forecaster's components instead of constructing a second pair
     if 'data_fetcher' not in st.session_state:
-        from data_fetcher import DataFetcher
-        st.session_state.data_fetcher = DataFetcher()
+        st.session_state.data_fetcher = forecaster.data_fetcher
     
     if 'forecaster' not in st.session_state:
-        from forecasting import StockForecaster
-        st.session_state.forecaster = StockForecaster()
+        st.session_state.forecaster = forecaster.forecaster
     
     # Display current market status
     from utils import format_market_status
@@ -462,6 +608,10 @@ def display_advanced_forecasting_dashboard():
         "📊 Live Price Monitoring"
     ])
     
+    # Compute the dates once per rerun so every widget and button agrees on "today"
+    today = datetime.now().date()
+    tomorrow = today + timedelta(days=1)
+    
     with tab1:
         st.subheader("⏰ Intraday Time Range Forecasting")
         st.markdown("Generate detailed forecast graphs for specific time ranges")
@@ -485,7 +635,7 @@ def display_advanced_forecasting_dashboard():
             selected_brand = st.selectbox("Select Brand/Index", brands, key="time_range_brand")
         
         with col2:
-            forecast_date = st.date_input("Forecast Date", datetime.now().date(), key="time_range_date")
+            forecast_date = st.date_input("Forecast Date", today, key="time_range_date")
         
         # Time range selection
         st.markdown("**Select Time Range:**")
@@ -528,7 +678,8 @@ def display_advanced_forecasting_dashboard():
             with st.spinner(f"Generating forecast for {selected_brand} from {start_time} to {end_time}..."):
                 
                 # Get historical data with fallback
-                historical_data, data_source = forecaster.get_data_with_fallback(selected_brand)
+                today_str = datetime.now(forecaster.pkt_timezone).strftime('%Y-%m-%d')
+                historical_data, data_source = forecaster.get_cached_data_with_fallback(selected_brand, today_str)
                 
                 # Show data source information
                 if data_source == 'authentic':
@@ -551,14 +702,15 @@ def display_advanced_forecasting_dashboard():
                             data_points_to_show = 60
                             historical_recent = historical_data.tail(data_points_to_show)
                             
-                            # Get the last historical price to connect forecast properly
-                            last_historical_price = historical_recent['close'].iloc[-1]
-                            first_forecast_price = forecast_data['yhat'].iloc[0]
+                            # Extract forecast values once; the last historical close is also the current price
+                            forecast_ds = forecast_data['ds']
+                            yhat = forecast_data['yhat'].to_numpy()
+                            start_price, end_price = yhat[0], yhat[-1]
+                            last_historical_price = historical_data['close'].iat[-1]
                             
                             # Adjust forecast to connect smoothly to historical data (remove gap)
-                            price_offset = first_forecast_price - last_historical_price
-                            adjusted_forecast = forecast_data.copy()
-                            adjusted_forecast['yhat'] = adjusted_forecast['yhat'] - price_offset
+                            price_offset = start_price - last_historical_price
+                            adjusted_yhat = yhat - price_offset
                             
                             # Add historical data with connecting line
                             fig.add_trace(go.Scatter(
@@ -572,18 +724,18 @@ def display_advanced_forecasting_dashboard():
                             
                             # Add connector line from last historical to first forecast
                             fig.add_trace(go.Scatter(
-                                x=[historical_recent['date'].iloc[-1], forecast_data['ds'].iloc[0]],
-                                y=[last_historical_price, adjusted_forecast['yhat'].iloc[0]],
+                                x=[historical_recent['date'].iat[-1], forecast_ds.iat[0]],
+                                y=[last_historical_price, adjusted_yhat[0]],
                                 mode='lines',
                                 name='Connection',
-                                line=dict(color='green', width=2, dash='dot'),
+                                line=_CONNECTOR_LINE,
                                 showlegend=True
                             ))
                             
                             # Add adjusted forecast line
                             fig.add_trace(go.Scatter(
-                                x=adjusted_forecast['ds'],
-                                y=adjusted_forecast['yhat'],
+                                x=forecast_ds,
+                                y=adjusted_yhat,
                                 mode='lines+markers',
                                 name=f'{selected_brand} Forecast',
                                 line=dict(color='blue', width=3),
@@ -591,22 +743,22 @@ def display_advanced_forecasting_dashboard():
                             ))
                             
                             # Add confidence interval (adjusted)
-                            if 'yhat_upper' in adjusted_forecast.columns and 'yhat_lower' in adjusted_forecast.columns:
+                            if 'yhat_upper' in forecast_data.columns and 'yhat_lower' in forecast_data.columns:
                                 # Also adjust confidence bounds
-                                adjusted_upper = adjusted_forecast['yhat_upper'] - price_offset
-                                adjusted_lower = adjusted_forecast['yhat_lower'] - price_offset
+                                adjusted_upper = forecast_data['yhat_upper'].to_numpy() - price_offset
+                                adjusted_lower = forecast_data['yhat_lower'].to_numpy() - price_offset
                                 fig.add_trace(go.Scatter(
-                                    x=list(adjusted_forecast['ds']) + list(adjusted_forecast['ds'][::-1]),
-                                    y=list(adjusted_upper) + list(adjusted_lower[::-1]),
+                                    x=np.concatenate([forecast_ds.to_numpy(), forecast_ds.to_numpy()[::-1]]),
+                                    y=np.concatenate([adjusted_upper, adjusted_lower[::-1]]),
                                     fill='toself',
                                     fillcolor='rgba(0,100,80,0.2)',
-                                    line=dict(color='rgba(255,255,255,0)'),
+                                    line=_CI_LINE,
                                     name='Confidence Interval',
                                     showlegend=True
                                 ))
                             
                             # Add current price marker
-                            current_price = historical_data['close'].iloc[-1]
+                            current_price = last_historical_price
                             current_time = datetime.now()
                             
                             fig.add_trace(go.Scatter(
@@ -624,11 +776,7 @@ def display_advanced_forecasting_dashboard():
                                 height=600,
                                 showlegend=True,
                                 hovermode='x unified',
-                                xaxis=dict(
-                                    tickformat='%H:%M',
-                                    tickmode='linear',
-                                    dtick=15*60*1000  # Show tick every 15 minutes
-                                )
+                                xaxis=_INTRADAY_XAXIS
                             )
                             
                             st.plotly_chart(fig, use_container_width=True)
@@ -639,17 +787,17 @@ def display_advanced_forecasting_dashboard():
                             col1, col2, col3, col4 = st.columns(4)
                             
                             with col1:
-                                st.metric("Start Price", f"{forecast_data['yhat'].iloc[0]:,.2f} PKR")
+                                st.metric("Start Price", f"{start_price:,.2f} PKR")
                             
                             with col2:
-                                st.metric("End Price", f"{forecast_data['yhat'].iloc[-1]:,.2f} PKR")
+                                st.metric("End Price", f"{end_price:,.2f} PKR")
                             
                             with col3:
-                                price_change = forecast_data['yhat'].iloc[-1] - forecast_data['yhat'].iloc[0]
+                                price_change = end_price - start_price
                                 st.metric("Expected Change", f"{price_change:+.2f} PKR")
                             
                             with col4:
-                                change_percent = (price_change / forecast_data['yhat'].iloc[0]) * 100
+                                change_percent = (price_change / start_price) * 100
                                 st.metric("Change %", f"{change_percent:+.2f}%")
                             
                             # Data source info
@@ -702,6 +850,15 @@ def display_advanced_forecasting_dashboard():
                 st.subheader("📋 Data Preview")
                 st.dataframe(processed_data.tail(10))
                 
+                # Forecasting only reads date and close; hand it one contiguous array per column
+                # and keep the full frame for display
+                fit_data = pd.DataFrame({
+                    'date': processed_data['date'].to_numpy(),
+                    'close': np.ascontiguousarray(
+                        pd.to_numeric(processed_data['close'], errors='coerce').to_numpy(dtype=np.float64)
+                    )
+                })
+                
                 # Forecast options
                 st.subheader("🎯 Generate Forecasts")
                 
@@ -709,8 +866,7 @@ def display_advanced_forecasting_dashboard():
                 
                 with col1:
                     if st.button("📅 Same Day Forecast", type="primary", key="same_day_forecast"):
-                        today = datetime.now().date()
-                        same_day_forecast = forecaster.generate_custom_date_forecast(processed_data, today, upload_brand)
+                        same_day_forecast = forecaster.generate_custom_date_forecast(fit_data, today, upload_brand)
                         
                         if same_day_forecast is not None:
                             st.success(f"**Same Day Forecast for {upload_brand}**")
@@ -719,8 +875,7 @@ def display_advanced_forecasting_dashboard():
                 
                 with col2:
                     if st.button("➡️ Next Day Forecast", type="primary", key="next_day_forecast"):
-                        tomorrow = datetime.now().date() + timedelta(days=1)
-                        next_day_forecast = forecaster.generate_custom_date_forecast(processed_data, tomorrow, upload_brand)
+                        next_day_forecast = forecaster.generate_custom_date_forecast(fit_data, tomorrow, upload_brand)
                         
                         if next_day_forecast is not None:
                             st.success(f"**Next Day Forecast for {upload_brand}**")
@@ -730,20 +885,19 @@ def display_advanced_forecasting_dashboard():
                 with col3:
                     if st.button("📊 Generate Full Graph", type="primary", key="full_graph_forecast"):
                         # Generate comprehensive forecast graph
-                        forecast = st.session_state.forecaster.forecast_stock(processed_data, days_ahead=7)
+                        forecast = _cached_forecast(st.session_state.forecaster, upload_brand, fit_data, 7)
                         
                         if forecast is not None and not forecast.empty:
                             fig = go.Figure()
                             
                             # Use tail(60) for consistent data display
                             historical_display = processed_data.tail(60)
-                            last_historical_price = historical_display['close'].iloc[-1]
-                            first_forecast_price = forecast['yhat'].iloc[0]
+                            last_historical_price = historical_display['close'].iat[-1]
+                            forecast_ds = forecast['ds']
                             
                             # Calculate offset and adjust forecast to connect smoothly
-                            price_offset = first_forecast_price - last_historical_price
-                            adjusted_forecast = forecast.copy()
-                            adjusted_forecast['yhat'] = adjusted_forecast['yhat'] - price_offset
+                            price_offset = forecast['yhat'].iat[0] - last_historical_price
+                            adjusted_yhat = forecast['yhat'].to_numpy() - price_offset
                             
                             # Historical data
                             fig.add_trace(go.Scatter(
@@ -751,48 +905,45 @@ def display_advanced_forecasting_dashboard():
                                 y=historical_display['close'],
                                 mode='lines',
                                 name='Historical Price',
-                                line=dict(color='blue', width=2)
+                                line=_HISTORICAL_LINE
                             ))
                             
                             # Add connector line
                             fig.add_trace(go.Scatter(
-                                x=[historical_display['date'].iloc[-1], forecast['ds'].iloc[0]],
-                                y=[last_historical_price, adjusted_forecast['yhat'].iloc[0]],
+                                x=[historical_display['date'].iat[-1], forecast_ds.iat[0]],
+                                y=[last_historical_price, adjusted_yhat[0]],
                                 mode='lines',
                                 name='Connection',
-                                line=dict(color='green', width=2, dash='dot'),
+                                line=_CONNECTOR_LINE,
                                 showlegend=True
                             ))
                             
                             # Adjusted forecast data
                             fig.add_trace(go.Scatter(
-                                x=adjusted_forecast['ds'],
-                                y=adjusted_forecast['yhat'],
+                                x=forecast_ds,
+                                y=adjusted_yhat,
                                 mode='lines+markers',
                                 name='Forecast',
-                                line=dict(color='red', width=3, dash='dash'),
+                                line=_UPLOAD_FORECAST_LINE,
                                 marker=dict(size=8)
                             ))
                             
                             # Adjusted confidence interval
-                            if 'yhat_upper' in adjusted_forecast.columns and 'yhat_lower' in adjusted_forecast.columns:
-                                adjusted_upper = adjusted_forecast['yhat_upper'] - price_offset
-                                adjusted_lower = adjusted_forecast['yhat_lower'] - price_offset
+                            if 'yhat_upper' in forecast.columns and 'yhat_lower' in forecast.columns:
+                                adjusted_upper = forecast['yhat_upper'].to_numpy() - price_offset
+                                adjusted_lower = forecast['yhat_lower'].to_numpy() - price_offset
                                 fig.add_trace(go.Scatter(
-                                    x=list(adjusted_forecast['ds']) + list(adjusted_forecast['ds'][::-1]),
-                                    y=list(adjusted_upper) + list(adjusted_lower[::-1]),
+                                    x=np.concatenate([forecast_ds.to_numpy(), forecast_ds.to_numpy()[::-1]]),
+                                    y=np.concatenate([adjusted_upper, adjusted_lower[::-1]]),
                                     fill='toself',
                                     fillcolor='rgba(255,0,0,0.2)',
-                                    line=dict(color='rgba(255,255,255,0)'),
+                                    line=_CI_LINE,
                                     name='Confidence Interval'
                                 ))
                             
                             fig.update_layout(
                                 title=f"{upload_brand} - Historical Data + 7-Day Forecast",
-                                xaxis_title="Date",
-                                yaxis_title="Price (PKR)",
-                                height=500,
-                                showlegend=True
+                                **_DAILY_LAYOUT
                             )
                             
                             st.plotly_chart(fig, use_container_width=True)
@@ -811,7 +962,7 @@ def display_advanced_forecasting_dashboard():
         with col2:
             target_date = st.date_input(
                 "Select Target Date", 
-                datetime.now().date() + timedelta(days=1),
+                tomorrow,
                 key="target_date"
             )
         
@@ -825,8 +976,15 @@ def display_advanced_forecasting_dashboard():
                     historical_data = st.session_state.data_fetcher.fetch_company_data(custom_brand)
                 
                 if historical_data is not None and not historical_data.empty:
+                    # One forecast serves both the target-date metrics and the trend graph;
+                    # its horizon runs a few days past the target instead of a fixed 30 days
+                    days_diff = (target_date - historical_data['date'].max().date()).days
+                    horizon = max(1, days_diff + 3)
+                    extended_forecast = st.session_state.forecaster.forecast_stock(
+                        historical_data, days_ahead=horizon
+                    )
                     custom_forecast = forecaster.generate_custom_date_forecast(
-                        historical_data, target_date, custom_brand
+                        historical_data, target_date, custom_brand, extended_forecast=extended_forecast
                     )
                     
                     if custom_forecast is not None:
@@ -843,9 +1001,7 @@ def display_advanced_forecasting_dashboard():
                         with col3:
                             st.metric("Upper Bound", f"{custom_forecast['yhat_upper']:,.2f} PKR")
                         
-                        # Generate trend graph
-                        extended_forecast = st.session_state.forecaster.forecast_stock(historical_data, days_ahead=30)
-                        
+                        # Trend graph
                         if extended_forecast is not None and not extended_forecast.empty:
                             fig = go.Figure()
                             
@@ -856,7 +1012,7 @@ def display_advanced_forecasting_dashboard():
                                 y=recent_data['close'],
                                 mode='lines',
                                 name='Recent Historical',
-                                line=dict(color='blue', width=2)
+                                line=_HISTORICAL_LINE
                             ))
                             
                             # Extended forecast
@@ -864,17 +1020,17 @@ def display_advanced_forecasting_dashboard():
                                 x=extended_forecast['ds'],
                                 y=extended_forecast['yhat'],
                                 mode='lines+markers',
-                                name='30-Day Forecast',
+                                name=f'{horizon}-Day Forecast',
                                 line=dict(color='green', width=2),
                                 marker=dict(size=6)
                             ))
                             
                             # Highlight target date
-                            target_forecast = extended_forecast[extended_forecast['ds'].dt.date == target_date]
-                            if not target_forecast.empty:
+                            target_idx = _first_index_on_date(extended_forecast['ds'], target_date)
+                            if target_idx is not None:
                                 fig.add_trace(go.Scatter(
-                                    x=[target_forecast['ds'].iloc[0]],
-                                    y=[target_forecast['yhat'].iloc[0]],
+                                    x=[extended_forecast['ds'].iat[target_idx]],
+                                    y=[extended_forecast['yhat'].iat[target_idx]],
                                     mode='markers',
                                     name='Target Date',
                                     marker=dict(size=15, color='red', symbol='star')
@@ -882,10 +1038,7 @@ def display_advanced_forecasting_dashboard():
                             
                             fig.update_layout(
                                 title=f"{custom_brand} - Custom Date Forecast Trend",
-                                xaxis_title="Date",
-                                yaxis_title="Price (PKR)",
-                                height=500,
-                                showlegend=True
+                                **_DAILY_LAYOUT
                             )
                             
                             st.plotly_chart(fig, use_container_width=True)
@@ -900,6 +1053,8 @@ def display_advanced_forecasting_dashboard():
         
         # Auto-refresh
         if st.button("🔄 Refresh Live Prices", key="refresh_live_prices"):
+            # Drop cached quotes so the rerun fetches fresh prices
+            AdvancedForecaster._lookup_live_price.clear()
             st.rerun()
         
         # Monitor multiple brands
@@ -907,39 +1062,33 @@ def display_advanced_forecasting_dashboard():
         
         st.markdown("**Live Prices from Multiple Sources:**")
         
-        for brand in monitor_brands:
-            with st.container():
-                col1, col2, col3, col4 = st.columns(4)
-                
-                live_data = forecaster.get_comprehensive_live_price(brand)
-                
-                with col1:
-                    st.metric(brand, f"{live_data['price']:,.2f} PKR")
-                
-                with col2:
-                    st.write(f"Source: {live_data['source']}")
-                
-                with col3:
-                    st.write(f"Time: {live_data['timestamp'].strftime('%H:%M:%S')}")
-                
-                with col4:
-                    # Quick forecast button
-                    if st.button(f"📈 Quick Forecast", key=f"quick_{brand}"):
-                        st.session_state[f"quick_forecast_{brand}"] = True
-                
-                # Show quick forecast if requested
-                if st.session_state.get(f"quick_forecast_{brand}", False):
-                    if brand == 'KSE-100':
-                        hist_data = st.session_state.data_fetcher.fetch_kse100_data()
-                    else:
-                        hist_data = st.session_state.data_fetcher.fetch_company_data(brand)
-                    
-                    if hist_data is not None and not hist_data.empty:
-                        quick_forecast = st.session_state.forecaster.forecast_stock(hist_data, days_ahead=1)
-                        if quick_forecast is not None and not quick_forecast.empty:
-                            next_price = quick_forecast['yhat'].iloc[-1]
-                            st.info(f"Next day prediction: {next_price:,.2f} PKR")
-                    
-                    st.session_state[f"quick_forecast_{brand}"] = False
-                
-                st.divider()
\ No newline at end of file
+        # Fetch all brands at once so total latency is the slowest brand, not the sum
+        live_prices = forecaster.get_live_prices(monitor_brands)
+        
+        # Render all quotes as one grid instead of a row of widgets per brand
+        prices_df = pd.DataFrame({
+            'Brand': monitor_brands,
+            'Price (PKR)': [round(live_prices[brand]['price'], 2) for brand in monitor_brands],
+            'Source': [live_prices[brand]['source'] for brand in monitor_brands],
+            'Time': [live_prices[brand]['timestamp'].strftime('%H:%M:%S') for brand in monitor_brands]
+        })
+        st.dataframe(prices_df, use_container_width=True, hide_index=True)
+        
+        # Single quick-forecast control below the grid
+        col1, col2 = st.columns([3, 1])
+        with col1:
+            quick_brand = st.selectbox("Quick Forecast Brand", monitor_brands, key="quick_forecast_brand")
+        with col2:
+            run_quick_forecast = st.button("📈 Quick Forecast", key="quick_forecast")
+        
+        if run_quick_forecast:
+            if quick_brand == 'KSE-100':
+                hist_data = st.session_state.data_fetcher.fetch_kse100_data()
+            else:
+                hist_data = st.session_state.data_fetcher.fetch_company_data(quick_brand)
+            
+            if hist_data is not None and not hist_data.empty:
+                quick_forecast = _cached_forecast(st.session_state.forecaster, quick_brand, hist_data, 1)
+                if quick_forecast is not None and not quick_forecast.empty:
+                    next_price = quick_forecast['yhat'].iloc[-1]
+                    st.info(f"{quick_brand} next day prediction: {next_price:,.2f} PKR")
\ No newline at end of file
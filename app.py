@@ -7,6 +7,13 @@ import time
 from datetime import datetime, timedelta
 import pytz
 import random
+import io
+import csv
+import codecs
+import zlib
+import uuid
+from collections import Counter
+from functools import lru_cache
 
 # Optional imports for Master Oracle Terminal
 try:
@@ -34,20 +41,8 @@ except ImportError:
 # Sector-wise model mapping using sklearn SGDRegressor for online learning
 # from streamlit_autorefresh import st_autorefresh  # Commented out due to installation issues
 
-# Import custom modules
-from data_fetcher import DataFetcher
-from forecasting import StockForecaster
-from visualization import ChartVisualizer
+# Import custom modules (page-specific modules are imported lazily below)
 from utils import export_to_csv, format_currency, format_market_status
-from simple_cache import get_cache_manager
-from enhanced_features import display_enhanced_file_upload
-from news_predictor import get_news_predictor
-from universal_predictor_new import get_universal_predictor
-from file_debug import analyze_uploaded_file, create_manual_dataframe
-from comprehensive_brand_predictor import get_comprehensive_brand_predictor
-from enhanced_psx_fetcher import EnhancedPSXFetcher
-from live_kse40_dashboard import LiveKSE40Dashboard
-from enhanced_live_dashboard import get_enhanced_live_dashboard
 
 # Page configuration
 st.set_page_config(
@@ -57,36 +52,394 @@ st.set_page_config(
     initial_sidebar_state="expanded"
 )
 
-def is_market_open():
-    """Check if PSX market is currently open"""
-    # Get current time in Pakistan timezone
-    pakistan_tz = pytz.timezone('Asia/Karachi')
+pakistan_tz = pytz.timezone('Asia/Karachi')
+_RNG = np.random.default_rng()
+
+# st.fragment (or its experimental predecessor) when this Streamlit has it
+_fragment = getattr(st, 'fragment', None) or getattr(st, 'experimental_fragment', None) or (lambda func: func)
+
+@lru_cache(maxsize=1)
+def _cached_market_state(bucket):
+    """Market open state for one 30-second time bucket"""
     now = datetime.now(pakistan_tz)
     # PSX operates Monday to Friday, 9:30 AM to 3:30 PM Pakistan time
-    if now.weekday() >= 5:  # Saturday = 5, Sunday = 6
-        return False
-    market_open = now.replace(hour=9, minute=30, second=0, microsecond=0)
-    market_close = now.replace(hour=15, minute=30, second=0, microsecond=0)
-    return market_open <= now <= market_close
+    return now.weekday() < 5 and (9, 30) <= (now.hour, now.minute) < (15, 30)
+
+def is_market_open():
+    """Check if PSX market is currently open"""
+    return _cached_market_state(int(time.time() // 30))
+
+# Process-wide singletons shared by every browser session.
+# Each getter imports its module only when first needed.
+@st.cache_resource
+def get_data_fetcher():
+    from data_fetcher import DataFetcher
+    return DataFetcher()
+
+@st.cache_resource
+def get_forecaster():
+    from forecasting import StockForecaster
+    return StockForecaster()
+
+@st.cache_resource
+def get_visualizer():
+    from visualization import ChartVisualizer
+    return ChartVisualizer()
+
+@st.cache_resource
+def get_cache_manager():
+    from simple_cache import SimpleCache
+    return SimpleCache()
+
+@st.cache_resource
+def get_enhanced_psx_fetcher():
+    from enhanced_psx_fetcher import EnhancedPSXFetcher
+    return EnhancedPSXFetcher()
+
+@st.cache_resource
+def get_news_predictor():
+    from news_predictor import NewsBasedPredictor
+    return NewsBasedPredictor()
+
+@st.cache_resource
+def get_universal_predictor():
+    from universal_predictor_new import UniversalPredictor
+    return UniversalPredictor()
+
+@st.cache_resource
+def get_brand_predictor():
+    from comprehensive_brand_predictor import ComprehensiveBrandPredictor
+    return ComprehensiveBrandPredictor()
+
+@st.cache_resource
+def get_live_kse40_dashboard():
+    from live_kse40_dashboard import LiveKSE40Dashboard
+    return LiveKSE40Dashboard()
+
+@st.cache_resource
+def get_enhanced_live_dashboard():
+    from enhanced_live_dashboard import EnhancedLiveDashboard
+    return EnhancedLiveDashboard()
+
+@st.cache_data(ttl=10, show_spinner=False)
+def _live_price(symbol):
+    """Live PSX price, reused across reruns for 10 seconds"""
+    return get_data_fetcher().get_live_psx_price(symbol)
+
+def _price_columns(data):
+    """Price frame as column name -> ndarray plus '_index'; the payload the history caches store"""
+    if data is None or data.empty:
+        return None
+    columns = {col: data[col].to_numpy() for col in data.columns}
+    columns['_index'] = data.index.to_numpy()
+    return columns
+
+def _price_frame(columns):
+    """DataFrame over _price_columns arrays for the chart, forecaster and exports"""
+    return pd.DataFrame({col: values for col, values in columns.items() if col != '_index'},
+                        index=columns['_index'], copy=False)
+
+def _load_kse100_history():
+    """KSE-100 history columns, preferring Yahoo Finance; returns (columns, from_yahoo)"""
+    kse_data = get_enhanced_psx_fetcher().fetch_kse100_historical("3mo")
+    from_yahoo = kse_data is not None and not kse_data.empty
+    if not from_yahoo:
+        kse_data = get_data_fetcher().fetch_kse100_data()
+    return _price_columns(kse_data), from_yahoo
+
+@st.cache_data(ttl=60, show_spinner=False)
+def _kse100_history_open():
+    """KSE-100 history while the market is trading"""
+    return _load_kse100_history()
+
+@st.cache_data(ttl=3600, show_spinner=False)
+def _kse100_history_closed():
+    """KSE-100 history while the market is closed and the data is static"""
+    return _load_kse100_history()
+
+def _kse100_history():
+    """KSE-100 (columns, from_yahoo), cached 60 s while open and 1 h while closed"""
+    return _kse100_history_open() if is_market_open() else _kse100_history_closed()
+
+@st.cache_data(ttl=300, show_spinner=False)
+def _cached_company_data(company_name):
+    """Company history columns keyed by company name"""
+    return _price_columns(get_data_fetcher().fetch_company_data(company_name))
+
+@st.cache_data(show_spinner=False)
+def _company_names():
+    """KSE-100 company names as a stable tuple for selectboxes"""
+    return tuple(get_data_fetcher().get_kse100_companies().keys())
+
+@st.cache_data(show_spinner=False)
+def _company_symbol_map():
+    """KSE-100 company name to symbol mapping"""
+    return dict(get_data_fetcher().get_kse100_companies())
+
+@st.cache_data(show_spinner=False)
+def _company_search_keys():
+    """Lower-cased (name, symbol) per KSE-100 company for substring search"""
+    return {name: (name.lower(), symbol.lower())
+            for name, symbol in get_data_fetcher().get_kse100_companies().items()}
+
+# Byte-order marks checked before falling back to UTF-8
+_BOM_ENCODINGS = (
+    (codecs.BOM_UTF8, 'utf-8-sig'),
+    (codecs.BOM_UTF16_LE, 'utf-16'),
+    (codecs.BOM_UTF16_BE, 'utf-16'),
+)
+_SNIFF_SAMPLE_CHARS = 65536
+
+def _detect_encoding(raw_content):
+    """Encoding implied by a leading BOM, defaulting to UTF-8"""
+    for bom, encoding in _BOM_ENCODINGS:
+        if raw_content.startswith(bom):
+            return encoding
+    return 'utf-8'
+
+def _sniff_delimiter(sample):
+    """Delimiter detected from a text sample, defaulting to comma"""
+    try:
+        return csv.Sniffer().sniff(sample, delimiters=',;\t|').delimiter
+    except csv.Error:
+        return ','
+
+# Static sidebar markup, built once at import time
+_SIDEBAR_HEADER_HTML = """
+<div style='background: linear-gradient(135deg, #667eea 0%, #764ba2 100%); padding: 20px; border-radius: 10px; margin-bottom: 20px; text-align: center;'>
+    <h2 style='color: white; margin: 0; font-size: 24px;'>&#128202; Dashboard Controls</h2>
+    <p style='color: #e8eaf6; margin: 5px 0 0 0; font-size: 14px;'>PSX Forecasting Hub</p>
+</div>
+"""
+
+_REFRESH_BTN_CSS = """
+<style>
+.refresh-btn {
+    background: linear-gradient(45deg, #FF6B6B, #4ECDC4);
+    border: none;
+    color: white;
+    padding: 10px 15px;
+    text-align: center;
+    text-decoration: none;
+    display: inline-block;
+    font-size: 14px;
+    margin: 10px 0;
+    cursor: pointer;
+    border-radius: 8px;
+    width: 100%;
+    font-weight: bold;
+}
+</style>
+"""
+
+_TIMER_TEMPLATE = """
+<div style='background-color: #e3f2fd; padding: 10px; border-radius: 5px; text-align: center;'>
+    <h3 style='margin: 0; color: #1565c0;'>&#9201;&#65039; {minutes_left:02d}:{seconds_left:02d}</h3>
+    <small style='color: #1976d2;'>Next refresh</small>
+</div>
+<div style='margin-top: 5px; font-size: 12px; color: #666;'>
+    Started: {started}
+</div>
+"""
+
+_LAST_UPDATE_TEMPLATE = """
+<div style='background-color: #e8f5e8; padding: 8px; border-radius: 5px; border-left: 3px solid #4caf50; margin: 10px 0;'>
+    <small style='color: #2e7d32; font-weight: bold;'>&#128338; Last Updated: {updated}</small>
+</div>
+"""
+
+_LIVE_PRICE_HEADER_HTML = """
+<div style='background: linear-gradient(135deg, #f093fb 0%, #f5576c 100%); padding: 15px; border-radius: 10px; margin: 15px 0; text-align: center;'>
+    <h4 style='color: white; margin: 0 0 10px 0; font-size: 16px;'>&#128308; Live PSX Price</h4>
+</div>
+"""
+
+_MARKET_CLOSED_HTML = """
+<div style='background-color: #ffebee; padding: 8px; border-radius: 4px; border-left: 3px solid #f44336; margin-bottom: 10px;'>
+    <small style='color: #c62828; font-weight: bold;'>&#127969; Market Closed - No live data available</small>
+</div>
+"""
+
+_SEPARATOR_HTML = """
+<hr style='border: none; height: 2px; background: linear-gradient(90deg, #667eea, #764ba2); margin: 20px 0;'>
+"""
+
+_ANALYSIS_HEADER_HTML = """
+<div style='background-color: #f8f9fa; padding: 15px; border-radius: 8px; margin: 10px 0; border-left: 4px solid #2196f3;'>
+    <h4 style='color: #1976d2; margin: 0 0 10px 0; font-size: 16px;'>&#127919; Analysis Type</h4>
+</div>
+"""
+
+_FORECAST_HEADER_HTML = """
+<div style='background-color: #fff3e0; padding: 15px; border-radius: 8px; margin: 15px 0; border-left: 4px solid #ff9800;'>
+    <h4 style='color: #e65100; margin: 0 0 10px 0; font-size: 16px;'>&#9889;&#65039; Forecast Settings</h4>
+</div>
+"""
+
+_TARGET_DATE_LABEL_HTML = """
+<div style='background-color: #e3f2fd; padding: 10px; border-radius: 5px; margin: 10px 0;'>
+    <label style='color: #1565c0; font-weight: bold; font-size: 14px;'>&#128197; Select Target Date</label>
+</div>
+"""
+
+_COMPANY_LABEL_HTML = """
+<div style='background-color: #f3e5f5; padding: 10px; border-radius: 5px; margin: 10px 0;'>
+    <label style='color: #7b1fa2; font-weight: bold; font-size: 14px;'>&#127969; Select Company</label>
+</div>
+"""
+
+_FILE_DEBUG_HEADER_HTML = """
+<div style='background-color: #fff8e1; padding: 10px; border-radius: 5px; margin: 15px 0; border-left: 4px solid #ffc107;'>
+    <h5 style='color: #f57c00; margin: 0; font-size: 14px;'>&#129514; File Upload Debug</h5>
+</div>
+"""
+
+_LIVE_PRICE_CARD_TEMPLATE = """
+<div style='background-color: {color}15; padding: 8px; border-radius: 4px; border-left: 3px solid {color}; margin-bottom: 10px;'>
+    <strong style='color: {color}; font-size: 18px;'>KSE-100: {price_text}</strong><br>
+    <small style='color: {color};'>{arrow} {change:+.2f} ({change_pct:+.2f}%)</small><br>
+    <small style='color: gray;'>Updated: {timestamp}</small>
+</div>
+"""
+
+def _fmt_price(value):
+    """Bare thousands-grouped price for HTML cards, e.g. 1,234.50"""
+    return f"{value:,.2f}"
+
+@st.cache_data(max_entries=32, show_spinner=False)
+def _live_price_card_html(price, change, timestamp):
+    """Sidebar markup for the live KSE-100 price card"""
+    change_pct = (change / price) * 100 if price else 0.0
+    color = "green" if change > 0 else "red" if change < 0 else "gray"
+    arrow = "â†—" if change > 0 else "â†˜" if change < 0 else "â†’"
+    return _LIVE_PRICE_CARD_TEMPLATE.format(
+        color=color, price_text=_fmt_price(price), arrow=arrow,
+        change=change, change_pct=change_pct, timestamp=timestamp
+    )
+
+@_fragment
+def _debug_upload_panel():
+    """Sidebar file-upload test; reruns on its own without redrawing the app"""
+    with st.expander("&#128269; Quick File Upload Test", expanded=False):
+        st.markdown("### Test Your File Upload Here")
+        debug_file = st.file_uploader("Upload test file (for debugging)", type=['csv', 'xlsx', 'xls'], key="debug_uploader")
+        if debug_file is None:
+            return
+
+        st.success("File uploaded successfully!")
+        st.write(f"**File name:** {debug_file.name}")
+        st.write(f"**File size:** {debug_file.size} bytes")
+        st.write(f"**File type:** {debug_file.type}")
+
+        try:
+            # Test 1: Read raw content once; parsers get their own BytesIO
+            raw_content = debug_file.getvalue()
+            st.write(f"**Raw content length:** {len(raw_content)} bytes")
+
+            # Test 2: Decode using the BOM-detected encoding
+            encoding = _detect_encoding(raw_content)
+            try:
+                text_content = raw_content.decode(encoding)
+                st.success(f"&#10003; {encoding} decode successful")
+
+                lines = text_content.split('\n')
+                st.write(f"**Number of lines:** {len(lines)}")
+
+                if lines:
+                    st.write("**First 3 lines:**")
+                    for i, line in enumerate(lines[:3]):
+                        st.code(f"Line {i+1}: {repr(line)}")
+
+                # Test 3: Sniff the delimiter from a sample, then a single pandas read
+                delimiter = _sniff_delimiter(text_content[:_SNIFF_SAMPLE_CHARS])
+                st.write(f"**Detected delimiter:** {delimiter!r}")
+                try:
+                    try:
+                        test_df = pd.read_csv(io.BytesIO(raw_content), sep=delimiter, encoding=encoding,
+                                              engine="pyarrow", dtype_backend="pyarrow")
+                        engine = "pyarrow"
+                    except (ImportError, ValueError):
+                        test_df = pd.read_csv(io.BytesIO(raw_content), sep=delimiter, encoding=encoding)
+                        engine = "c"
+                    st.success(f"&#10003; Pandas read successful ({engine} engine)")
+                    st.write(f"**Dataframe shape:** {test_df.shape}")
+                    st.write(f"**Columns:** {list(test_df.columns)}")
+                    st.dataframe(test_df.head(3))
+
+                    st.success("Your file is perfectly readable! The issue is likely in the universal predictor logic.")
+
+                except Exception as pandas_error:
+                    st.error(f"&#10005; Pandas read failed: {str(pandas_error)}")
+
+            except Exception as decode_error:
+                st.error(f"âœ— {encoding} decode failed: {str(decode_error)}")
+
+                # Try other encodings
+                st.write("**Trying other encodings:**")
+                for encoding in ['latin-1', 'cp1252', 'iso-8859-1']:
+                    try:
+                        alt_content = raw_content.decode(encoding)
+                        st.success(f"&#10003; {encoding} decode successful")
+                        break
+                    except Exception as enc_error:
+                        st.write(f"&#10005; {encoding}: {str(enc_error)}")
+
+        except Exception as e:
+            st.error(f"**Error processing file:** {str(e)}")
+
+# Forecast horizon for each fixed forecast_type option
+_DAYS_AHEAD = {
+    "Today (Intraday)": 0,
+    "Morning Session (9:30-12:00)": 0,
+    "Afternoon Session (12:00-15:30)": 0,
+    "Next Day": 1,
+}
+
+# Pages that import their module only when opened
+def _show_advanced_forecasting(*_):
+    from advanced_forecasting import display_advanced_forecasting_dashboard
+    display_advanced_forecasting_dashboard()
+
+def _show_enhanced_file_upload(*_):
+    from enhanced_features import display_enhanced_file_upload
+    display_enhanced_file_upload()
+
+def _show_comprehensive_intraday(*_):
+    from comprehensive_intraday import display_comprehensive_intraday_forecasts
+    display_comprehensive_intraday_forecasts()
+
+# analysis_type -> page renderer, called as
+# page(selected_company, forecast_type, days_ahead, custom_date)
+_DISPATCH = {
+    "ðŸ“Š Enhanced Live Dashboard (Top 80 KSE-100)": lambda *_: get_enhanced_live_dashboard().display_live_dashboard(),
+    "ðŸ”´ Live KSE-40 (5-Min Updates)": lambda *_: get_live_kse40_dashboard().display_live_dashboard(),
+    "Live Market Dashboard": lambda *_: display_live_market_dashboard(),
+    "âš¡ 15-Minute Live Predictions": lambda *_: display_five_minute_live_predictions(),
+    "ðŸ” Comprehensive Brand Predictions": lambda *_: get_brand_predictor().display_comprehensive_brand_predictions(),
+    "KSE-100 Index": lambda company, *settings: display_kse100_analysis(*settings),
+    "Individual Companies": lambda *settings: display_company_analysis(*settings),
+    "Advanced Forecasting Hub": _show_advanced_forecasting,
+    "ðŸ“ Universal File Upload": lambda *_: display_universal_file_upload(),
+    "ðŸ“° News-Based Predictions": lambda *_: display_news_based_predictions(),
+    "Enhanced File Upload": _show_enhanced_file_upload,
+    "ðŸ›ï¸ All KSE-100 Companies (Live Prices)": lambda *_: display_all_kse100_live_prices(),
+    "All Companies Live Prices": lambda *_: display_all_companies_live_prices(),
+    "Intraday Trading Sessions": lambda company, *settings: display_intraday_sessions_analysis(*settings),
+    "Comprehensive Intraday Forecasts": _show_comprehensive_intraday,
+    "ðŸ“ˆ Technical Analysis Indicators": lambda *_: display_technical_analysis(),
+    "ðŸ’Ž Master Oracle Terminal (Crypto + Commodities)": lambda *_: display_master_oracle_terminal(),
+}
 
 def main():
-    # Initialize session state FIRST
-    if 'data_fetcher' not in st.session_state:
-        st.session_state.data_fetcher = DataFetcher()
-    if 'forecaster' not in st.session_state:
-        st.session_state.forecaster = StockForecaster()
-    if 'visualizer' not in st.session_state:
-        st.session_state.visualizer = ChartVisualizer()
-    if 'cache_manager' not in st.session_state:
-        st.session_state.cache_manager = get_cache_manager()
-    if 'news_predictor' not in st.session_state:
-        st.session_state.news_predictor = get_news_predictor()
-    if 'universal_predictor' not in st.session_state:
-        st.session_state.universal_predictor = get_universal_predictor()
-    if 'brand_predictor' not in st.session_state:
-        st.session_state.brand_predictor = get_comprehensive_brand_predictor()
-    if 'enhanced_psx_fetcher' not in st.session_state:
-        st.session_state.enhanced_psx_fetcher = EnhancedPSXFetcher()
+    # Expose the shared components through session state for the pages
+    # and modules that read them from there
+    st.session_state.data_fetcher = get_data_fetcher()
+    st.session_state.forecaster = get_forecaster()
+    st.session_state.visualizer = get_visualizer()
+    st.session_state.cache_manager = get_cache_manager()
+    st.session_state.enhanced_psx_fetcher = get_enhanced_psx_fetcher()
+
+    # Per-user state
     if 'last_update' not in st.session_state:
         st.session_state.last_update = None
     if 'kse_data' not in st.session_state:
@@ -95,10 +448,6 @@ def main():
         st.session_state.companies_data = {}
     if 'all_kse100_data' not in st.session_state:
         st.session_state.all_kse100_data = {}
-    if 'live_kse40_dashboard' not in st.session_state:
-        st.session_state.live_kse40_dashboard = LiveKSE40Dashboard()
-    if 'enhanced_live_dashboard' not in st.session_state:
-        st.session_state.enhanced_live_dashboard = get_enhanced_live_dashboard()
     
     # Initialize sklearn SGDRegressor-based sector models (online learning) if available
     if 'sector_models' not in st.session_state:
@@ -229,33 +578,10 @@ def main():
     # Sidebar for controls
     with st.sidebar:
         # Attractive header with gradient
-        st.markdown("""
-        <div style='background: linear-gradient(135deg, #667eea 0%, #764ba2 100%); padding: 20px; border-radius: 10px; margin-bottom: 20px; text-align: center;'>
-            <h2 style='color: white; margin: 0; font-size: 24px;'>&#128202; Dashboard Controls</h2>
-            <p style='color: #e8eaf6; margin: 5px 0 0 0; font-size: 14px;'>PSX Forecasting Hub</p>
-        </div>
-        """, unsafe_allow_html=True)
+        st.markdown(_SIDEBAR_HEADER_HTML, unsafe_allow_html=True)
 
         # Refresh button with better styling
-        st.markdown("""
-        <style>
-        .refresh-btn {
-            background: linear-gradient(45deg, #FF6B6B, #4ECDC4);
-            border: none;
-            color: white;
-            padding: 10px 15px;
-            text-align: center;
-            text-decoration: none;
-            display: inline-block;
-            font-size: 14px;
-            margin: 10px 0;
-            cursor: pointer;
-            border-radius: 8px;
-            width: 100%;
-            font-weight: bold;
-        }
-        </style>
-        """, unsafe_allow_html=True)
+        st.markdown(_REFRESH_BTN_CSS, unsafe_allow_html=True)
 
         if st.button("&#128260; Refresh Data Now", key="refresh_data_btn", type="primary"):
             st.session_state.last_update = None
@@ -271,7 +597,7 @@ def main():
             start_time = st.session_state.auto_refresh_start_time
             
             # Ensure timezone awareness
-            pkt = pytz.timezone('Asia/Karachi')
+            pkt = pakistan_tz
             now_pkt = datetime.now(pkt)
             
             if start_time.tzinfo is None:
@@ -287,75 +613,46 @@ def main():
             st.progress(progress_val)
             
             # Timer display
-            st.markdown(f"""
-            <div style='background-color: #e3f2fd; padding: 10px; border-radius: 5px; text-align: center;'>
-                <h3 style='margin: 0; color: #1565c0;'>&#9201;&#65039; {minutes_left:02d}:{seconds_left:02d}</h3>
-                <small style='color: #1976d2;'>Next refresh</small>
-            </div>
-            <div style='margin-top: 5px; font-size: 12px; color: #666;'>
-                Started: {start_time.strftime('%H:%M:%S')}
-            </div>
-            """, unsafe_allow_html=True)
+            st.markdown(_TIMER_TEMPLATE.format(
+                minutes_left=minutes_left, seconds_left=seconds_left,
+                started=start_time.strftime('%H:%M:%S')
+            ), unsafe_allow_html=True)
         else:
             st.info("Enable auto-refresh in the 15-Minute Live Predictions section")
 
         # Show last update time with better styling
         if st.session_state.last_update:
-            st.markdown(f"""
-            <div style='background-color: #e8f5e8; padding: 8px; border-radius: 5px; border-left: 3px solid #4caf50; margin: 10px 0;'>
-                <small style='color: #2e7d32; font-weight: bold;'>&#128338; Last Updated: {st.session_state.last_update.strftime('%H:%M:%S')}</small>
-            </div>
-            """, unsafe_allow_html=True)
+            st.markdown(_LAST_UPDATE_TEMPLATE.format(updated=st.session_state.last_update.strftime('%H:%M:%S')), unsafe_allow_html=True)
 
         # Live Price Display with enhanced styling
-        st.markdown("""
-        <div style='background: linear-gradient(135deg, #f093fb 0%, #f5576c 100%); padding: 15px; border-radius: 10px; margin: 15px 0; text-align: center;'>
-            <h4 style='color: white; margin: 0 0 10px 0; font-size: 16px;'>&#128308; Live PSX Price</h4>
-        </div>
-        """, unsafe_allow_html=True)
+        st.markdown(_LIVE_PRICE_HEADER_HTML, unsafe_allow_html=True)
 
         if is_market_open():
             # Get live KSE-100 price
-            live_price_data = st.session_state.data_fetcher.get_live_psx_price("KSE-100")
+            live_price_data = _live_price("KSE-100")
             if live_price_data:
                 price = live_price_data['price']
                 timestamp = live_price_data['timestamp'].strftime('%H:%M:%S')
                 source = live_price_data.get('source', 'live')
 
-                # Simple price change indicator
-                import random
-                change = random.uniform(-200, 200)
-                change_pct = (change / price) * 100
-                color = "green" if change > 0 else "red" if change < 0 else "gray"
-                arrow = "â†—" if change > 0 else "â†˜" if change < 0 else "â†’"
+                # Real change against the previous live sample
+                prev_price = st.session_state.get('prev_live_price', price)
+                if price != prev_price:
+                    st.session_state.live_price_change = price - prev_price
+                st.session_state.prev_live_price = price
+                change = st.session_state.get('live_price_change', 0.0)
 
-                st.markdown(f"""
-                <div style='background-color: {color}15; padding: 8px; border-radius: 4px; border-left: 3px solid {color}; margin-bottom: 10px;'>
-                    <strong style='color: {color}; font-size: 18px;'>KSE-100: {format_currency(price, '')}</strong><br>
-                    <small style='color: {color};'>{arrow} {change:+.2f} ({change_pct:+.2f}%)</small><br>
-                    <small style='color: gray;'>Updated: {timestamp}</small>
-                </div>
-                """, unsafe_allow_html=True)
+                st.markdown(_live_price_card_html(price, change, timestamp), unsafe_allow_html=True)
             else:
                 st.info("&#128202; Live price data not available at the moment.")
         else:
-            st.markdown("""
-            <div style='background-color: #ffebee; padding: 8px; border-radius: 4px; border-left: 3px solid #f44336; margin-bottom: 10px;'>
-                <small style='color: #c62828; font-weight: bold;'>&#127969; Market Closed - No live data available</small>
-            </div>
-            """, unsafe_allow_html=True)
+            st.markdown(_MARKET_CLOSED_HTML, unsafe_allow_html=True)
         
         # Separator with style
-        st.markdown("""
-        <hr style='border: none; height: 2px; background: linear-gradient(90deg, #667eea, #764ba2); margin: 20px 0;'>
-        """, unsafe_allow_html=True)
+        st.markdown(_SEPARATOR_HTML, unsafe_allow_html=True)
 
         # Analysis type selection with styled container
-        st.markdown("""
-        <div style='background-color: #f8f9fa; padding: 15px; border-radius: 8px; margin: 10px 0; border-left: 4px solid #2196f3;'>
-            <h4 style='color: #1976d2; margin: 0 0 10px 0; font-size: 16px;'>&#127919; Analysis Type</h4>
-        </div>
-        """, unsafe_allow_html=True)
+        st.markdown(_ANALYSIS_HEADER_HTML, unsafe_allow_html=True)
 
         analysis_type = st.selectbox(
             "",
@@ -364,11 +661,7 @@ def main():
         )
 
         # Forecast Settings with enhanced styling
-        st.markdown("""
-        <div style='background-color: #fff3e0; padding: 15px; border-radius: 8px; margin: 15px 0; border-left: 4px solid #ff9800;'>
-            <h4 style='color: #e65100; margin: 0 0 10px 0; font-size: 16px;'>&#9889;&#65039; Forecast Settings</h4>
-        </div>
-        """, unsafe_allow_html=True)
+        st.markdown(_FORECAST_HEADER_HTML, unsafe_allow_html=True)
 
         forecast_type = st.selectbox(
             "",
@@ -377,14 +670,9 @@ def main():
         )
         
         custom_date = None
-        days_ahead = 1
         
         if forecast_type == "Custom Date Range":
-            st.markdown("""
-            <div style='background-color: #e3f2fd; padding: 10px; border-radius: 5px; margin: 10px 0;'>
-                <label style='color: #1565c0; font-weight: bold; font-size: 14px;'>&#128197; Select Target Date</label>
-            </div>
-            """, unsafe_allow_html=True)
+            st.markdown(_TARGET_DATE_LABEL_HTML, unsafe_allow_html=True)
             custom_date = st.date_input(
                 "",
                 value=datetime.now().date() + timedelta(days=7),
@@ -392,147 +680,126 @@ def main():
                 max_value=datetime.now().date() + timedelta(days=365)
             )
             days_ahead = (custom_date - datetime.now().date()).days
-        elif forecast_type == "Today (Intraday)":
-            days_ahead = 0
-        elif forecast_type.startswith("Morning Session"):
-            days_ahead = 0
-        elif forecast_type.startswith("Afternoon Session"):
-            days_ahead = 0
+        else:
+            days_ahead = _DAYS_AHEAD[forecast_type]
 
         # Company selection for individual analysis
         selected_company = None
         if analysis_type == "Individual Companies":
-            st.markdown("""
-            <div style='background-color: #f3e5f5; padding: 10px; border-radius: 5px; margin: 10px 0;'>
-                <label style='color: #7b1fa2; font-weight: bold; font-size: 14px;'>&#127969; Select Company</label>
-            </div>
-            """, unsafe_allow_html=True)
-            companies = st.session_state.data_fetcher.get_kse100_companies()
+            st.markdown(_COMPANY_LABEL_HTML, unsafe_allow_html=True)
             selected_company = st.selectbox(
                 "",
-                list(companies.keys()),
+                _company_names(),
                 key="selected_company"
             )
         
         # Debug section for file upload issues
         if analysis_type == "ðŸ“ Universal File Upload":
-            st.markdown("""
-            <div style='background-color: #fff8e1; padding: 10px; border-radius: 5px; margin: 15px 0; border-left: 4px solid #ffc107;'>
-                <h5 style='color: #f57c00; margin: 0; font-size: 14px;'>&#129514; File Upload Debug</h5>
-            </div>
-            """, unsafe_allow_html=True)
-            with st.expander("&#128269; Quick File Upload Test", expanded=False):
-                st.markdown("### Test Your File Upload Here")
-                debug_file = st.file_uploader("Upload test file (for debugging)", type=['csv', 'xlsx', 'xls'], key="debug_uploader")
-                
-                if debug_file is not None:
-                    st.success("File uploaded successfully!")
-                    st.write(f"**File name:** {debug_file.name}")
-                    st.write(f"**File size:** {debug_file.size} bytes")
-                    st.write(f"**File type:** {debug_file.type}")
-                    
-                    try:
-                        # Test 1: Read raw content
-                        debug_file.seek(0)
-                        raw_content = debug_file.read()
-                        st.write(f"**Raw content length:** {len(raw_content)} bytes")
-                        
-                        # Test 2: Try to decode
-                        try:
-                            text_content = raw_content.decode('utf-8')
-                            st.success("&#10003; UTF-8 decode successful")
-                            
-                            lines = text_content.split('\n')
-                            st.write(f"**Number of lines:** {len(lines)}")
-                            
-                            if lines:
-                                st.write("**First 3 lines:**")
-                                for i, line in enumerate(lines[:3]):
-                                    st.code(f"Line {i+1}: {repr(line)}")
-                            
-                            # Test 3: Try pandas read
-                            debug_file.seek(0)
-                            try:
-                                test_df = pd.read_csv(debug_file)
-                                st.success("&#10003; Pandas read successful")
-                                st.write(f"**Dataframe shape:** {test_df.shape}")
-                                st.write(f"**Columns:** {list(test_df.columns)}")
-                                st.dataframe(test_df.head(3))
-                                
-                                st.success("Your file is perfectly readable! The issue is likely in the universal predictor logic.")
-                                
-                            except Exception as pandas_error:
-                                st.error(f"&#10005; Pandas read failed: {str(pandas_error)}")
-                                
-                                # Try alternative methods
-                                st.write("**Trying alternative methods:**")
-                                for delimiter in [',', ';', '\t', '|']:
-                                    try:
-                                        debug_file.seek(0)
-                                        alt_df = pd.read_csv(debug_file, delimiter=delimiter)
-                                        st.success(f"&#10003; Alternative method with '{delimiter}' delimiter: {alt_df.shape}")
-                                        st.dataframe(alt_df.head(3))
-                                        break
-                                    except Exception as alt_error:
-                                        st.write(f"&#10005; Delimiter '{delimiter}': {str(alt_error)}")
-                            
-                        except Exception as decode_error:
-                            st.error(f"âœ— UTF-8 decode failed: {str(decode_error)}")
-                            
-                            # Try other encodings
-                            st.write("**Trying other encodings:**")
-                            for encoding in ['latin-1', 'cp1252', 'iso-8859-1']:
-                                try:
-                                    alt_content = raw_content.decode(encoding)
-                                    st.success(f"&#10003; {encoding} decode successful")
-                                    break
-                                except Exception as enc_error:
-                                    st.write(f"&#10005; {encoding}: {str(enc_error)}")
-                                    
-                    except Exception as e:
-                        st.error(f"**Error processing file:** {str(e)}")
+            st.markdown(_FILE_DEBUG_HEADER_HTML, unsafe_allow_html=True)
+            _debug_upload_panel()
     
     # Main content area
-    if analysis_type == "ðŸ“Š Enhanced Live Dashboard (Top 80 KSE-100)":
-        # Enhanced Live Dashboard with top 80 companies
-        st.session_state.enhanced_live_dashboard.display_live_dashboard()
-        
-    elif analysis_type == "ðŸ”´ Live KSE-40 (5-Min Updates)":
-        st.session_state.live_kse40_dashboard.display_live_dashboard()
-    elif analysis_type == "Live Market Dashboard":
-        display_live_market_dashboard()
-    elif analysis_type == "âš¡ 15-Minute Live Predictions":
-        display_five_minute_live_predictions()
-    elif analysis_type == "ðŸ” Comprehensive Brand Predictions":
-        st.session_state.brand_predictor.display_comprehensive_brand_predictions()
-    elif analysis_type == "KSE-100 Index":
-        display_kse100_analysis(forecast_type, days_ahead, custom_date)
-    elif analysis_type == "Individual Companies":
-        display_company_analysis(selected_company, forecast_type, days_ahead, custom_date)
-    elif analysis_type == "Advanced Forecasting Hub":
-        from advanced_forecasting import display_advanced_forecasting_dashboard
-        display_advanced_forecasting_dashboard()
-    elif analysis_type == "ðŸ“ Universal File Upload":
-        display_universal_file_upload()
-    elif analysis_type == "ðŸ“° News-Based Predictions":
-        display_news_based_predictions()
-    elif analysis_type == "Enhanced File Upload":
-        display_enhanced_file_upload()
-    elif analysis_type == "ðŸ›ï¸ All KSE-100 Companies (Live Prices)":
-        display_all_kse100_live_prices()
-    elif analysis_type == "All Companies Live Prices":
-        display_all_companies_live_prices()
-    elif analysis_type == "Intraday Trading Sessions":
-        display_intraday_sessions_analysis(forecast_type, days_ahead, custom_date)
-    elif analysis_type == "Comprehensive Intraday Forecasts":
-        from comprehensive_intraday import display_comprehensive_intraday_forecasts
-        display_comprehensive_intraday_forecasts()
-    elif analysis_type == "ðŸ“ˆ Technical Analysis Indicators":
-        display_technical_analysis()
-    elif analysis_type == "ðŸ’Ž Master Oracle Terminal (Crypto + Commodities)":
-        display_master_oracle_terminal()
-    else:
-        display_cache_overview()
+    page = _DISPATCH.get(analysis_type, lambda *_: display_cache_overview())
+    page(selected_company, forecast_type, days_ahead, custom_date)
+
+def _forecast_summary(forecast_data, current_price):
+    """Last forecast point, its confidence bounds and change vs current price"""
+    forecast_price, lower, upper = forecast_data[['yhat', 'yhat_lower', 'yhat_upper']].to_numpy()[-1]
+    change = forecast_price - current_price
+    change_pct = (change / current_price) * 100 if current_price else 0.0
+    return forecast_price, lower, upper, change, change_pct
+
+@st.cache_data(ttl=3600, max_entries=32, show_spinner=False)
+def _cached_price_forecast(name, days_ahead, last_bar, _data):
+    """Forecast keyed on name, horizon and last bar so the frame itself is not hashed"""
+    return get_forecaster().forecast_stock(_data, days_ahead=days_ahead)
+
+def _last_bar(data):
+    """Cheap fingerprint of a price frame: length plus its final row"""
+    if data is None or data.empty:
+        return (0,)
+    return (len(data), str(data.index[-1]), tuple(map(str, data.iloc[-1])))
+
+def _render_price_analysis(name, columns, data, close_col, days_ahead):
+    """Price metrics, history chart and forecast shared by the KSE-100 and company pages"""
+    # Current price display from the cached column arrays; the frame over them
+    # is only handed to the visualizer and forecaster
+    closes = columns[close_col]
+    current_price = closes[-1]
+    prev_price = closes[-2] if closes.size > 1 else current_price
+    latest_high, latest_low = columns['high'][-1], columns['low'][-1]
+    change = current_price - prev_price
+    change_pct = (change / prev_price) * 100 if prev_price != 0 else 0
+
+    # Display current metrics
+    metric_col1, metric_col2, metric_col3 = st.columns(3)
+
+    with metric_col1:
+        st.metric(
+            "Current Price",
+            format_currency(current_price),
+            delta=f"{change:+.2f} ({change_pct:+.2f}%)"
+        )
+
+    with metric_col2:
+        st.metric("High", format_currency(latest_high))
+
+    with metric_col3:
+        st.metric("Low", format_currency(latest_low))
+
+    # Historical chart
+    st.markdown("### &#128200; Live Price Movement")
+    historical_chart = st.session_state.visualizer.create_price_chart(
+        data, f"{name} - Live Data"
+    )
+    st.plotly_chart(historical_chart, use_container_width=True)
+
+    # Forecasting
+    st.markdown("### &#128270; Price Forecast")
+
+    with st.spinner("Generating forecast..."):
+        try:
+            forecast_data = _cached_price_forecast(name, days_ahead, _last_bar(data), data)
+
+            if forecast_data is not None:
+                # Display forecast metrics
+                (forecast_price, confidence_lower, confidence_upper,
+                 forecast_change, forecast_change_pct) = _forecast_summary(forecast_data, current_price)
+
+                forecast_col1, forecast_col2 = st.columns(2)
+
+                with forecast_col1:
+                    period_text = {
+                        0: "End of Day",
+                        1: "Tomorrow",
+                        days_ahead: f"{days_ahead} Days Ahead" if days_ahead > 1 else "Tomorrow"
+                    }.get(days_ahead, f"{days_ahead} Days Ahead")
+
+                    st.metric(
+                        f"Forecasted Price ({period_text})",
+                        format_currency(forecast_price),
+                        delta=f"{forecast_change:+.2f} ({forecast_change_pct:+.2f}%)"
+                    )
+
+                with forecast_col2:
+                    st.metric(
+                        "Confidence Range",
+                        f"{format_currency(confidence_lower)} - {format_currency(confidence_upper)}"
+                    )
+
+                # Forecast chart
+                forecast_chart = st.session_state.visualizer.create_forecast_chart(
+                    data, forecast_data, f"{name} Forecast"
+                )
+                st.plotly_chart(forecast_chart, use_container_width=True)
+
+            else:
+                st.error("Unable to generate forecast. Insufficient data.")
+
+        except Exception as e:
+            st.error(f"Forecasting error: {str(e)}")
+
+    return current_price
 
 def display_kse100_analysis(forecast_type, days_ahead, custom_date):
     """Display KSE-100 index analysis and forecasting"""
@@ -583,34 +850,13 @@ def display_kse100_analysis(forecast_type, days_ahead, custom_date):
     # Fetch KSE-100 data
     with st.spinner("Fetching KSE-100 data..."):
         try:
-            kse_data = None
-            
-            # First try to get recent data from cache
-            cached_data = st.session_state.cache_manager.get_stock_data('KSE-100', days=30)
-            
-            # Check if we have valid cached data
-            need_fresh_data = True
-            if cached_data is not None and not cached_data.empty:
-                need_fresh_data = False
-                kse_data = cached_data
-            
-            # Fetch fresh data if needed
-            if need_fresh_data:
-                # Try enhanced fetcher first for historical data
-                if hasattr(st.session_state, 'enhanced_psx_fetcher'):
-                    kse_data = st.session_state.enhanced_psx_fetcher.fetch_kse100_historical("3mo")
-                    if kse_data is not None and not kse_data.empty:
-                        st.success("ðŸ“¡ Fetched historical data from Yahoo Finance")
-                
-                # Fallback to data_fetcher if enhanced fails
-                if (kse_data is None or kse_data.empty) and hasattr(st.session_state, 'data_fetcher'):
-                    kse_data = st.session_state.data_fetcher.fetch_kse100_data()
-                
-                if kse_data is not None and not kse_data.empty:
-                    # Store in cache
-                    st.session_state.cache_manager.store_stock_data('KSE-100', 'KSE-100 Index', kse_data)
+            # Shared KSE-100 history cache; tries Yahoo Finance before the PSX fetcher
+            kse_columns, from_yahoo = _kse100_history()
+            if from_yahoo:
+                st.success("ðŸ“¡ Fetched historical data from Yahoo Finance")
             
-            if kse_data is not None and not kse_data.empty:
+            if kse_columns:
+                kse_data = _price_frame(kse_columns)
                 st.session_state.kse_data = kse_data
                 st.session_state.last_update = datetime.now()
 
@@ -627,90 +873,13 @@ def display_kse100_analysis(forecast_type, days_ahead, custom_date):
                     st.error(f"Error loading market data: No close price column found in data. Available columns: {list(kse_data.columns)}")
                     return
 
-                # Current price display
-                current_price = kse_data[close_col].iloc[-1]
-                prev_price = kse_data[close_col].iloc[-2] if len(kse_data) > 1 else current_price
-                change = current_price - prev_price
-                change_pct = (change / prev_price) * 100 if prev_price != 0 else 0
-                
-                # Display current metrics
-                metric_col1, metric_col2, metric_col3 = st.columns(3)
-                
-                with metric_col1:
-                    st.metric(
-                        "Current Price",
-                        format_currency(current_price),
-                        delta=f"{change:+.2f} ({change_pct:+.2f}%)"
-                    )
-                
-                with metric_col2:
-                    st.metric("High", format_currency(kse_data['high'].iloc[-1]))
-                
-                with metric_col3:
-                    st.metric("Low", format_currency(kse_data['low'].iloc[-1]))
+                current_price = _render_price_analysis("KSE-100 Index", kse_columns, kse_data, close_col, days_ahead)
 
-                    # Historical chart
-                    st.markdown("### &#128200; Live Price Movement")
-                    historical_chart = st.session_state.visualizer.create_price_chart(
-                        kse_data, "KSE-100 Index - Live Data"
-                    )
-                    st.plotly_chart(historical_chart, use_container_width=True)
-
-                    # Forecasting
-                    st.markdown("### &#128270; Price Forecast")
-
-                    with st.spinner("Generating forecast..."):
-                        try:
-                            forecast_data = st.session_state.forecaster.forecast_stock(
-                                kse_data, days_ahead=days_ahead
-                            )
-
-                            if forecast_data is not None:
-                                # Display forecast metrics
-                                forecast_price = forecast_data['yhat'].iloc[-1]
-                                forecast_change = forecast_price - current_price
-                                forecast_change_pct = (forecast_change / current_price) * 100
-                                
-                                forecast_col1, forecast_col2 = st.columns(2)
-                                
-                                with forecast_col1:
-                                    period_text = {
-                                        0: "End of Day",
-                                        1: "Tomorrow",
-                                        days_ahead: f"{days_ahead} Days Ahead" if days_ahead > 1 else "Tomorrow"
-                                    }.get(days_ahead, f"{days_ahead} Days Ahead")
-                                    
-                                    st.metric(
-                                        f"Forecasted Price ({period_text})",
-                                        format_currency(forecast_price),
-                                        delta=f"{forecast_change:+.2f} ({forecast_change_pct:+.2f}%)"
-                                    )
-                                
-                                with forecast_col2:
-                                    confidence_lower = forecast_data['yhat_lower'].iloc[-1]
-                                    confidence_upper = forecast_data['yhat_upper'].iloc[-1]
-                                    st.metric(
-                                        "Confidence Range",
-                                        f"{format_currency(confidence_lower)} - {format_currency(confidence_upper)}"
-                                    )
-                                
-                                # Forecast chart
-                                forecast_chart = st.session_state.visualizer.create_forecast_chart(
-                                    kse_data, forecast_data, "KSE-100 Index Forecast"
-                                )
-                                st.plotly_chart(forecast_chart, use_container_width=True)
-                                
-                            else:
-                                st.error("Unable to generate forecast. Insufficient data.")
-                                
-                        except Exception as e:
-                            st.error(f"Forecasting error: {str(e)}")
-                
-                    # ==========================================
-                    # COMPREHENSIVE INTRADAY FORECAST SECTION
-                    # ==========================================
-                    st.markdown("---")
-                    st.markdown("## &#128200; Comprehensive Intraday Forecast")
+                # ==========================================
+                # COMPREHENSIVE INTRADAY FORECAST SECTION
+                # ==========================================
+                st.markdown("---")
+                st.markdown("## &#128200; Comprehensive Intraday Forecast")
                 
                 # Import and display comprehensive intraday forecast
                 from comprehensive_intraday import ComprehensiveIntradayForecaster, is_trading_day, get_next_trading_day
@@ -723,13 +892,12 @@ def display_kse100_analysis(forecast_type, days_ahead, custom_date):
                 
                 # Get live price for current KSE-100
                 live_price = None
-                if hasattr(st.session_state, 'enhanced_psx_fetcher'):
-                    try:
-                        live_kse = st.session_state.enhanced_psx_fetcher.get_live_price("KSE-100")
-                        if live_kse and live_kse.get('price'):
-                            live_price = live_kse['price']
-                    except:
-                        pass
+                try:
+                    live_kse = get_enhanced_psx_fetcher().get_live_price("KSE-100")
+                    if live_kse and live_kse.get('price'):
+                        live_price = live_kse['price']
+                except:
+                    pass
                 
                 if live_price is None:
                     live_price = current_price
@@ -1104,107 +1272,14 @@ def display_company_analysis(selected_company, forecast_type, days_ahead, custom
     # Fetch company data
     with st.spinner(f"Fetching {selected_company} data..."):
         try:
-            company_data = None
-            company_symbol = st.session_state.data_fetcher.get_kse100_companies()[selected_company]
+            company_columns = _cached_company_data(selected_company)
             
-            # First try to get recent data from cache
-            cached_data = st.session_state.cache_manager.get_stock_data(company_symbol, days=30)
-            
-            # Check if we have valid cached data
-            need_fresh_data = True
-            if cached_data is not None and not cached_data.empty:
-                need_fresh_data = False
-                company_data = cached_data
-            
-            # Fetch fresh data if needed
-            if need_fresh_data:
-                company_data = st.session_state.data_fetcher.fetch_company_data(selected_company)
-                if company_data is not None and not company_data.empty:
-                    # Store in cache
-                    st.session_state.cache_manager.store_stock_data(company_symbol, selected_company, company_data)
-            
-            if company_data is not None and not company_data.empty:
+            if company_columns:
+                company_data = _price_frame(company_columns)
                 st.session_state.companies_data[selected_company] = company_data
                 
-                # Current price display
-                current_price = company_data['close'].iloc[-1]
-                prev_price = company_data['close'].iloc[-2] if len(company_data) > 1 else current_price
-                change = current_price - prev_price
-                change_pct = (change / prev_price) * 100 if prev_price != 0 else 0
-                
-                # Display current metrics
-                metric_col1, metric_col2, metric_col3 = st.columns(3)
-                
-                with metric_col1:
-                    st.metric(
-                        "Current Price",
-                        format_currency(current_price),
-                        delta=f"{change:+.2f} ({change_pct:+.2f}%)"
-                    )
-                
-                with metric_col2:
-                    st.metric("High", format_currency(company_data['high'].iloc[-1]))
-                
-                with metric_col3:
-                    st.metric("Low", format_currency(company_data['low'].iloc[-1]))
-                
-                # Historical chart
-                st.subheader("ðŸ“ˆ Live Price Movement")
-                historical_chart = st.session_state.visualizer.create_price_chart(
-                    company_data, f"{selected_company} - Live Data"
-                )
-                st.plotly_chart(historical_chart, use_container_width=True)
-                
-                # Forecasting
-                st.subheader("ðŸ”® Price Forecast")
-                
-                with st.spinner("Generating forecast..."):
-                    try:
-                        forecast_data = st.session_state.forecaster.forecast_stock(
-                            company_data, days_ahead=days_ahead
-                        )
-                        
-                        if forecast_data is not None:
-                            # Display forecast metrics
-                            forecast_price = forecast_data['yhat'].iloc[-1]
-                            forecast_change = forecast_price - current_price
-                            forecast_change_pct = (forecast_change / current_price) * 100
-                            
-                            forecast_col1, forecast_col2 = st.columns(2)
-                            
-                            with forecast_col1:
-                                period_text = {
-                                    0: "End of Day",
-                                    1: "Tomorrow",
-                                    days_ahead: f"{days_ahead} Days Ahead" if days_ahead > 1 else "Tomorrow"
-                                }.get(days_ahead, f"{days_ahead} Days Ahead")
-                                
-                                st.metric(
-                                    f"Forecasted Price ({period_text})",
-                                    format_currency(forecast_price),
-                                    delta=f"{forecast_change:+.2f} ({forecast_change_pct:+.2f}%)"
-                                )
-                            
-                            with forecast_col2:
-                                confidence_lower = forecast_data['yhat_lower'].iloc[-1]
-                                confidence_upper = forecast_data['yhat_upper'].iloc[-1]
-                                st.metric(
-                                    "Confidence Range",  
-                                    f"{format_currency(confidence_lower)} - {format_currency(confidence_upper)}"
-                                )
-                            
-                            # Forecast chart
-                            forecast_chart = st.session_state.visualizer.create_forecast_chart(
-                                company_data, forecast_data, f"{selected_company} Forecast"
-                            )
-                            st.plotly_chart(forecast_chart, use_container_width=True)
-                            
-                        else:
-                            st.error("Unable to generate forecast. Insufficient data.")
-                            
-                    except Exception as e:
-                        st.error(f"Forecasting error: {str(e)}")
-                
+                _render_price_analysis(selected_company, company_columns, company_data, 'close', days_ahead)
+
             else:
                 st.error(f"Unable to fetch {selected_company} data. Please try again later.")
                 
@@ -1220,7 +1295,7 @@ def display_cache_overview():
     # Cache statistics
     col1, col2, col3 = st.columns(3)
     
-    cache_stats = st.session_state.cache_manager.get_cache_stats()
+    cache_stats = get_cache_manager().get_cache_stats()
     
     with col1:
         st.metric("Cache Status", "Active âœ…")
@@ -1262,7 +1337,7 @@ def display_cache_overview():
         
         with col1:
             if st.button("ðŸ—‘ï¸ Clear Cache", help="Clear all cached data"):
-                st.session_state.cache_manager.clear_cache()
+                get_cache_manager().clear_cache()
                 st.session_state.kse_data = None
                 st.session_state.companies_data = {}
                 st.success("Cache cleared successfully!")
@@ -1272,6 +1347,79 @@ def display_cache_overview():
                 st.session_state.last_update = None
                 st.success("Data refresh triggered!")
 
+_SESSION_STATUS_TEMPLATE = """
+<div style='text-align: center; padding: 10px; background-color: {color}20; border-radius: 5px;'>
+    <h4 style='color: {color}; margin: 0;'>MARKET {status}</h4>
+</div>
+"""
+
+_SESSION_PRICE_TEMPLATE = """
+<div style='text-align: center; padding: 15px; background-color: #f0f2f6; border-radius: 8px; border: 2px solid #1f77b4;'>
+    <h2 style='color: #1f77b4; margin: 0;'>KSE-100: {price_text}</h2>
+    <small>Last Update: {updated}</small>
+</div>
+"""
+
+@st.cache_data(ttl=300, max_entries=16, show_spinner=False)
+def _session_figure(data, current_price, trace_name, color, title, show_opening=False,
+                    current_color='red', current_label="Current", yaxis_title="Price (PKR)"):
+    """Plotly line chart for an intraday session path with reference lines"""
+    fig = go.Figure()
+    fig.add_trace(go.Scatter(
+        x=data['time'],
+        y=data['price'],
+        mode='lines',
+        name=trace_name,
+        line=dict(color=color, width=3)
+    ))
+
+    if show_opening:
+        opening_price = data['price'].iloc[0]
+        fig.add_hline(
+            y=opening_price,
+            line_dash="dot",
+            line_color="blue",
+            annotation_text=f"Opening: {opening_price:,.2f}",
+            annotation_position="bottom right"
+        )
+
+    fig.add_hline(
+        y=current_price,
+        line_dash="dash",
+        line_color=current_color,
+        annotation_text=f"{current_label}: {current_price:,.2f}",
+        annotation_position="top right"
+    )
+
+    fig.update_layout(
+        uirevision='intraday',
+        title=title,
+        xaxis_title="Time (PKT)",
+        yaxis_title=yaxis_title,
+        height=500,
+        showlegend=True,
+        xaxis=dict(tickformat='%H:%M', tickangle=45)
+    )
+    return fig
+
+def _render_session_chart(data, current_price, labels, **figure_args):
+    """Session chart plus open/high/low/change metrics named by labels"""
+    st.plotly_chart(_session_figure(data, current_price, **figure_args), use_container_width=True)
+
+    prices = data['price'].to_numpy()
+    session_open = prices[0]
+    session_change = prices[-1] - session_open
+
+    col1, col2, col3, col4 = st.columns(4)
+    with col1:
+        st.metric(labels[0], f"{session_open:,.2f} PKR")
+    with col2:
+        st.metric(labels[1], f"{prices.max():,.2f} PKR")
+    with col3:
+        st.metric(labels[2], f"{prices.min():,.2f} PKR")
+    with col4:
+        st.metric(labels[3], f"{session_change:+.2f} PKR", f"{(session_change/session_open)*100:+.2f}%")
+
 def display_intraday_sessions_analysis(forecast_type, days_ahead, custom_date):
     """Display intraday trading sessions analysis with live prices and half-day forecasts"""
     
@@ -1279,14 +1427,14 @@ def display_intraday_sessions_analysis(forecast_type, days_ahead, custom_date):
     st.markdown("**PSX Trading Hours:** 9:30 AM - 3:30 PM (Monday to Friday)")
     
     # Get live price for current analysis
-    live_price_data = st.session_state.data_fetcher.get_live_psx_price("KSE-100")
+    live_price_data = _live_price("KSE-100")
     
     if live_price_data:
         current_price = live_price_data['price']
         timestamp = live_price_data['timestamp']
         
         # Display current market status
-        current_time = datetime.now(pytz.timezone('Asia/Karachi'))
+        current_time = datetime.now(pakistan_tz)
         market_open = current_time.replace(hour=9, minute=30, second=0, microsecond=0)
         market_close = current_time.replace(hour=15, minute=30, second=0, microsecond=0)
 
@@ -1298,19 +1446,13 @@ def display_intraday_sessions_analysis(forecast_type, days_ahead, custom_date):
         col1, col2, col3 = st.columns([1, 2, 1])
         
         with col1:
-            st.markdown(f"""
-            <div style='text-align: center; padding: 10px; background-color: {status_color}20; border-radius: 5px;'>
-                <h4 style='color: {status_color}; margin: 0;'>MARKET {status_text}</h4>
-            </div>
-            """, unsafe_allow_html=True)
+            st.markdown(_SESSION_STATUS_TEMPLATE.format(color=status_color, status=status_text),
+                        unsafe_allow_html=True)
         
         with col2:
-            st.markdown(f"""
-            <div style='text-align: center; padding: 15px; background-color: #f0f2f6; border-radius: 8px; border: 2px solid #1f77b4;'>
-                <h2 style='color: #1f77b4; margin: 0;'>KSE-100: {format_currency(current_price, '')}</h2>
-                <small>Last Update: {timestamp.strftime('%H:%M:%S')}</small>
-            </div>
-            """, unsafe_allow_html=True)
+            st.markdown(_SESSION_PRICE_TEMPLATE.format(price_text=_fmt_price(current_price),
+                                                       updated=timestamp.strftime('%H:%M:%S')),
+                        unsafe_allow_html=True)
         
         with col3:
             st.metric("Current Time", datetime.now().strftime("%H:%M:%S"))
@@ -1318,19 +1460,19 @@ def display_intraday_sessions_analysis(forecast_type, days_ahead, custom_date):
         # Historical data for forecasting
         st.markdown("---")
         
+        # Closed market: skip the history fetch and show only tomorrow's forecast
+        if not is_market_open and not st.checkbox("Show all sessions", key="intraday_show_all_sessions"):
+            st.info("Market closed - showing next day forecast only")
+            _render_next_day_forecast(current_time, current_price)
+            return
+        
         with st.spinner("Fetching historical data for session analysis..."):
-            # Try enhanced fetcher first for historical data
-            kse_data = None
-            if hasattr(st.session_state, 'enhanced_psx_fetcher'):
-                kse_data = st.session_state.enhanced_psx_fetcher.fetch_kse100_historical("3mo")
-                if kse_data is not None and not kse_data.empty:
-                    st.success("ðŸ“¡ Fetched historical data from Yahoo Finance")
-            
-            # Fallback to data_fetcher if enhanced fails
-            if (kse_data is None or kse_data.empty) and hasattr(st.session_state, 'data_fetcher'):
-                kse_data = st.session_state.data_fetcher.fetch_kse100_data()
+            # Yahoo Finance first, falling back to data_fetcher; TTL follows market state
+            kse_columns, from_yahoo = _kse100_history()
+            if from_yahoo:
+                st.success("ðŸ“¡ Fetched historical data from Yahoo Finance")
             
-            if kse_data is not None and not kse_data.empty:
+            if kse_columns:
                 # Session-based forecasting
                 st.subheader("ðŸ“ˆ Session-Based Predictions")
                 
@@ -1345,7 +1487,6 @@ def display_intraday_sessions_analysis(forecast_type, days_ahead, custom_date):
                     st.write("**Morning Session Analysis (9:45 AM - 12:00 PM)**")
 
                     # Check if market is open for morning session
-                    current_time = datetime.now(pytz.timezone('Asia/Karachi'))
                     morning_start = current_time.replace(hour=9, minute=45, second=0, microsecond=0)
                     morning_end = current_time.replace(hour=12, minute=0, second=0, microsecond=0)
 
@@ -1358,70 +1499,17 @@ def display_intraday_sessions_analysis(forecast_type, days_ahead, custom_date):
                         morning_data = generate_morning_session_data(current_price)
 
                         if morning_data is not None and not morning_data.empty:
-                            # Create morning session chart
-                            fig = go.Figure()
-
-                            # Morning session price movement
-                            fig.add_trace(go.Scatter(
-                                x=morning_data['time'],
-                                y=morning_data['price'],
-                                mode='lines+markers',
-                                name='Morning Session Prices',
-                                line=dict(color='green', width=3),
-                                marker=dict(size=6, color='green')
-                            ))
-
-                            # Add opening price reference
-                            opening_price = morning_data['price'].iloc[0]
-                            fig.add_hline(
-                                y=opening_price,
-                                line_dash="dot",
-                                line_color="blue",
-                                annotation_text=f"Opening: {opening_price:,.2f}",
-                                annotation_position="bottom right"
-                            )
-
-                            # Add current price
-                            fig.add_hline(
-                                y=current_price,
-                                line_dash="dash",
-                                line_color="red",
-                                annotation_text=f"Current: {current_price:,.2f}",
-                                annotation_position="top right"
-                            )
-
-                            fig.update_layout(
+                            _render_session_chart(
+                                morning_data, current_price,
+                                ("Opening Price", "Morning High", "Morning Low", "Session Change"),
+                                trace_name='Morning Session Prices', color='green',
                                 title="ðŸ“ˆ Morning Session Intraday Chart (9:45 AM - 12:00 PM)",
-                                xaxis_title="Time (PKT)",
-                                yaxis_title="Price (PKR)",
-                                height=500,
-                                showlegend=True,
-                                xaxis=dict(tickformat='%H:%M', tickangle=45)
-                            )
-
-                            st.plotly_chart(fig, use_container_width=True)
-
-                            # Display morning session metrics
-                            morning_high = morning_data['price'].max()
-                            morning_low = morning_data['price'].min()
-                            morning_change = morning_data['price'].iloc[-1] - morning_data['price'].iloc[0]
-
-                            col1, col2, col3, col4 = st.columns(4)
-
-                            with col1:
-                                st.metric("Opening Price", f"{opening_price:,.2f} PKR")
-                            with col2:
-                                st.metric("Morning High", f"{morning_high:,.2f} PKR")
-                            with col3:
-                                st.metric("Morning Low", f"{morning_low:,.2f} PKR")
-                            with col4:
-                                st.metric("Session Change", f"{morning_change:+.2f} PKR", f"{(morning_change/opening_price)*100:+.2f}%")
+                                show_opening=True)
                         else:
                             st.error("Unable to generate morning session data")
                 
                 with tab2:
                     # Check current time to determine what to show
-                    current_time = datetime.now(pytz.timezone('Asia/Karachi'))
                     eleven_am = current_time.replace(hour=11, minute=0, second=0, microsecond=0)
                     twelve_pm = current_time.replace(hour=12, minute=0, second=0, microsecond=0)
                     
@@ -1433,53 +1521,11 @@ def display_intraday_sessions_analysis(forecast_type, days_ahead, custom_date):
                         afternoon_data = generate_afternoon_session_data(current_price)
                         
                         if afternoon_data is not None and not afternoon_data.empty:
-                            # Create afternoon session chart
-                            fig = go.Figure()
-                            
-                            # Afternoon session price movement
-                            fig.add_trace(go.Scatter(
-                                x=afternoon_data['time'],
-                                y=afternoon_data['price'],
-                                mode='lines+markers',
-                                name='Afternoon Session Prices',
-                                line=dict(color='orange', width=3),
-                                marker=dict(size=6, color='orange')
-                            ))
-                            
-                            # Add current price reference
-                            fig.add_hline(
-                                y=current_price,
-                                line_dash="dash",
-                                line_color="red",
-                                annotation_text=f"Current: {current_price:,.2f}",
-                                annotation_position="top right"
-                            )
-                            
-                            fig.update_layout(
-                                title="ðŸ“ˆ Afternoon Session Intraday Chart (12:00 PM - 3:30 PM)",
-                                xaxis_title="Time (PKT)",
-                                yaxis_title="Price (PKR)",
-                                height=500,
-                                showlegend=True,
-                                xaxis=dict(tickformat='%H:%M', tickangle=45)
-                            )
-                            
-                            st.plotly_chart(fig, use_container_width=True)
-                            
-                            # Metrics
-                            afternoon_high = afternoon_data['price'].max()
-                            afternoon_low = afternoon_data['price'].min()
-                            afternoon_change = afternoon_data['price'].iloc[-1] - afternoon_data['price'].iloc[0]
-                            
-                            col1, col2, col3, col4 = st.columns(4)
-                            with col1:
-                                st.metric("Session Start", f"{afternoon_data['price'].iloc[0]:,.2f} PKR")
-                            with col2:
-                                st.metric("Session High", f"{afternoon_high:,.2f} PKR")
-                            with col3:
-                                st.metric("Session Low", f"{afternoon_low:,.2f} PKR")
-                            with col4:
-                                st.metric("Session Change", f"{afternoon_change:+.2f} PKR", f"{(afternoon_change/afternoon_data['price'].iloc[0])*100:+.2f}%")
+                            _render_session_chart(
+                                afternoon_data, current_price,
+                                ("Session Start", "Session High", "Session Low", "Session Change"),
+                                trace_name='Afternoon Session Prices', color='orange',
+                                title="ðŸ“ˆ Afternoon Session Intraday Chart (12:00 PM - 3:30 PM)")
                         else:
                             st.error("Unable to generate afternoon session data")
                     
@@ -1492,63 +1538,12 @@ def display_intraday_sessions_analysis(forecast_type, days_ahead, custom_date):
                         half_day_data = generate_half_day_data(current_price)
                         
                         if half_day_data is not None and not half_day_data.empty:
-                            # Create half day chart
-                            fig = go.Figure()
-                            
-                            # Half day price movement
-                            fig.add_trace(go.Scatter(
-                                x=half_day_data['time'],
-                                y=half_day_data['price'],
-                                mode='lines+markers',
-                                name='Half Day Prices (First Half)',
-                                line=dict(color='green', width=3),
-                                marker=dict(size=6, color='green')
-                            ))
-                            
-                            # Add opening price reference
-                            opening_price = half_day_data['price'].iloc[0]
-                            fig.add_hline(
-                                y=opening_price,
-                                line_dash="dot",
-                                line_color="blue",
-                                annotation_text=f"Opening: {opening_price:,.2f}",
-                                annotation_position="bottom right"
-                            )
-                            
-                            # Add current price
-                            fig.add_hline(
-                                y=current_price,
-                                line_dash="dash",
-                                line_color="red",
-                                annotation_text=f"Current: {current_price:,.2f}",
-                                annotation_position="top right"
-                            )
-                            
-                            fig.update_layout(
+                            _render_session_chart(
+                                half_day_data, current_price,
+                                ("Opening Price", "Half Day High", "Half Day Low", "Half Day Change"),
+                                trace_name='Half Day Prices (First Half)', color='green',
                                 title="ðŸ“ˆ Half Day Chart - First Half Completed (9:45 AM - 12:00 PM)",
-                                xaxis_title="Time (PKT)",
-                                yaxis_title="Price (PKR)",
-                                height=500,
-                                showlegend=True,
-                                xaxis=dict(tickformat='%H:%M', tickangle=45)
-                            )
-                            
-                            st.plotly_chart(fig, use_container_width=True)
-                            
-                            # Metrics
-                            half_day_high = half_day_data['price'].max()
-                            half_day_low = half_day_data['price'].min()
-                            half_day_change = half_day_data['price'].iloc[-1] - half_day_data['price'].iloc[0]
-                            
-                            col1, col2, col3, col4 = st.columns(4)
-                            with col1:
-                                st.metric("Opening Price", f"{opening_price:,.2f} PKR")
-                            with col2:
-                                st.metric("Half Day High", f"{half_day_high:,.2f} PKR")
-                            with col3:
-                                st.metric("Half Day Low", f"{half_day_low:,.2f} PKR")
-                            with col4:
-                                st.metric("Half Day Change", f"{half_day_change:+.2f} PKR", f"{(half_day_change/opening_price)*100:+.2f}%")
+                                show_opening=True)
                         else:
                             st.error("Unable to generate half day data")
                     
@@ -1563,156 +1558,98 @@ def display_intraday_sessions_analysis(forecast_type, days_ahead, custom_date):
                     full_day_data = generate_full_day_data(current_price)
                     
                     if full_day_data is not None and not full_day_data.empty:
-                        # Create full day chart
-                        fig = go.Figure()
-                        
-                        # Full day price movement
-                        fig.add_trace(go.Scatter(
-                            x=full_day_data['time'],
-                            y=full_day_data['price'],
-                            mode='lines+markers',
-                            name='Full Day Forecast',
-                            line=dict(color='purple', width=3),
-                            marker=dict(size=4, color='purple')
-                        ))
-                        
-                        # Add current price as reference line
-                        fig.add_hline(
-                            y=current_price, 
-                            line_dash="dash", 
-                            line_color="green",
-                            annotation_text=f"Current: {current_price:,.2f}",
-                            annotation_position="top right"
-                        )
-                        
-                        fig.update_layout(
+                        _render_session_chart(
+                            full_day_data, current_price,
+                            ("Day Open", "Day High", "Day Low", "Day Change"),
+                            trace_name='Full Day Forecast', color='purple',
                             title="ðŸ“ˆ Today's Full Trading Day Forecast (9:45 AM - 3:30 PM)",
-                            xaxis_title="Time (PKT)",
-                            yaxis_title="Predicted Price (PKR)",
-                            height=500,
-                            showlegend=True,
-                            xaxis=dict(tickformat='%H:%M', tickangle=45)
-                        )
-                        
-                        st.plotly_chart(fig, use_container_width=True)
-                        
-                        # Metrics
-                        day_high = full_day_data['price'].max()
-                        day_low = full_day_data['price'].min()
-                        day_change = full_day_data['price'].iloc[-1] - full_day_data['price'].iloc[0]
-                        
-                        col1, col2, col3, col4 = st.columns(4)
-                        with col1:
-                            st.metric("Day Open", f"{full_day_data['price'].iloc[0]:,.2f} PKR")
-                        with col2:
-                            st.metric("Day High", f"{day_high:,.2f} PKR")
-                        with col3:
-                            st.metric("Day Low", f"{day_low:,.2f} PKR")
-                        with col4:
-                            st.metric("Day Change", f"{day_change:+.2f} PKR", f"{(day_change/full_day_data['price'].iloc[0])*100:+.2f}%")
+                            current_color='green',
+                            yaxis_title="Predicted Price (PKR)")
                     
                     else:
                         st.error("Unable to generate full day data")
 
                 with tab4:
-                    st.write("**Next Day Full Forecast (9:45 AM - 3:30 PM)**")
-                    
-                    # Check if it's after 3:00 PM for refresh indicator
-                    current_time = datetime.now(pytz.timezone('Asia/Karachi'))
-                    afternoon_cutoff = current_time.replace(hour=15, minute=0, second=0, microsecond=0)
-                    
-                    if current_time >= afternoon_cutoff:
-                        st.info("ðŸ”„ **Updated at 3:00 PM** - Fresh next day forecast generated daily after 3:00 PM")
-                    else:
-                        st.info("ðŸ’¡ **Note**: This forecast refreshes daily at 3:00 PM with updated predictions for tomorrow")
-                    
-                    # Generate next day full data
-                    next_day_full_data = generate_next_day_full_data(current_price)
-                    
-                    if next_day_full_data is not None and not next_day_full_data.empty:
-                        # Create next day chart
-                        fig = go.Figure()
-                        
-                        # Next day price movement
-                        fig.add_trace(go.Scatter(
-                            x=next_day_full_data['time'],
-                            y=next_day_full_data['price'],
-                            mode='lines+markers',
-                            name='Next Day Full Forecast',
-                            line=dict(color='cyan', width=3),
-                            marker=dict(size=4, color='cyan')
-                        ))
-                        
-                        # Add current price reference
-                        fig.add_hline(
-                            y=current_price, 
-                            line_dash="dash", 
-                            line_color="orange",
-                            annotation_text=f"Today's Price: {current_price:,.2f}",
-                            annotation_position="top right"
-                        )
-                        
-                        fig.update_layout(
-                            title="ðŸ“ˆ Next Day Full Trading Day Forecast (9:45 AM - 3:30 PM)",
-                            xaxis_title="Time (PKT)",
-                            yaxis_title="Predicted Price (PKR)",
-                            height=500,
-                            showlegend=True,
-                            xaxis=dict(tickformat='%H:%M', tickangle=45)
-                        )
-                        
-                        st.plotly_chart(fig, use_container_width=True)
-                        
-                        # Metrics
-                        day_high = next_day_full_data['price'].max()
-                        day_low = next_day_full_data['price'].min()
-                        day_change = next_day_full_data['price'].iloc[-1] - next_day_full_data['price'].iloc[0]
-                        
-                        col1, col2, col3, col4 = st.columns(4)
-                        with col1:
-                            st.metric("Predicted Open", f"{next_day_full_data['price'].iloc[0]:,.2f} PKR")
-                        with col2:
-                            st.metric("Predicted High", f"{day_high:,.2f} PKR")
-                        with col3:
-                            st.metric("Predicted Low", f"{day_low:,.2f} PKR")
-                        with col4:
-                            st.metric("Predicted Day Change", f"{day_change:+.2f} PKR", f"{(day_change/next_day_full_data['price'].iloc[0])*100:+.2f}%")
-                    else:
-                        st.error("Unable to generate next day full forecast data")
+                    _render_next_day_forecast(current_time, current_price)
 
-def generate_morning_session_data(current_price):
-    """Generate realistic morning session intraday data"""
-    try:
-        import pytz
-        pkt = pytz.timezone('Asia/Karachi')
-        today = datetime.now(pkt).date()
-        
-        # Use seeded random generator for consistent daily graph
-        rng = random.Random(f"{today}_morning")
+def _render_next_day_forecast(current_time, current_price):
+    """Next day full session forecast with its 3:00 PM refresh note"""
+    st.write("**Next Day Full Forecast (9:45 AM - 3:30 PM)**")
+    
+    # Check if it's after 3:00 PM for refresh indicator
+    afternoon_cutoff = current_time.replace(hour=15, minute=0, second=0, microsecond=0)
+    
+    if current_time >= afternoon_cutoff:
+        st.info("ðŸ”„ **Updated at 3:00 PM** - Fresh next day forecast generated daily after 3:00 PM")
+    else:
+        st.info("ðŸ’¡ **Note**: This forecast refreshes daily at 3:00 PM with updated predictions for tomorrow")
+    
+    # Generate next day full data
+    next_day_full_data = generate_next_day_full_data(current_price)
+    
+    if next_day_full_data is not None and not next_day_full_data.empty:
+        _render_session_chart(
+            next_day_full_data, current_price,
+            ("Predicted Open", "Predicted High", "Predicted Low", "Predicted Day Change"),
+            trace_name='Next Day Full Forecast', color='cyan',
+            title="ðŸ“ˆ Next Day Full Trading Day Forecast (9:45 AM - 3:30 PM)",
+            current_color='orange',
+            current_label="Today's Price",
+            yaxis_title="Predicted Price (PKR)")
+    else:
+        st.error("Unable to generate next day full forecast data")
 
-        # Morning session: 9:45 AM to 12:00 PM (2.25 hours = 27 intervals of 5 minutes)
-        start_time = datetime(today.year, today.month, today.day, 9, 45, 0)
-        times = []
-        prices = []
+def _session_rng(seed):
+    """NumPy generator seeded from a string, stable across processes"""
+    return np.random.default_rng(zlib.crc32(seed.encode()))
 
-        base_price = current_price
+# Session codes for integer seeds of the form YYYYMMDD * 10 + code
+_SESSION_CODES = {'morning': 0, 'afternoon': 1, 'full_day': 2, 'next_day_pre_3pm': 3,
+                  'next_day_post_3pm': 4, 'half_day': 5}
 
-        for i in range(28):  # 28 intervals for 27 periods
-            current_time = start_time + timedelta(minutes=5 * i)
-            times.append(current_time.strftime('%H:%M'))
+def _session_seed(date, session):
+    """Stable integer seed for a session on a given date"""
+    return int(date.strftime('%Y%m%d')) * 10 + _SESSION_CODES[session]
 
-            if i == 0:
-                # Opening price with slight gap
-                price = base_price * rng.uniform(0.995, 1.005)
-            else:
-                # Progressive morning movement with higher volatility
-                volatility = rng.uniform(-0.008, 0.010)  # Higher morning volatility
-                price = prices[-1] * (1 + volatility)
+# Per-step volatility bounds as (hour before which the bounds apply, low, high)
+_MORNING_VOL = ((24, -0.008, 0.010),)
+_AFTERNOON_VOL = ((24, -0.006, 0.007),)
+_FULL_DAY_VOL = ((11, -0.008, 0.010), (14, -0.005, 0.005), (24, -0.007, 0.008))
 
-            prices.append(price)
+@st.cache_data(ttl=3600, show_spinner=False)
+def _build_path(seed, start_dt, n, open_lo, open_hi, vol_table):
+    """Seeded unit 5-minute price path with an opening gap and hour-dependent volatility"""
+    rng = np.random.default_rng(seed)
+    times = pd.date_range(start_dt, periods=n, freq='5min')
 
-        return pd.DataFrame({'time': times, 'price': prices})
+    hours = times[1:].hour.to_numpy()
+    conditions = [hours < limit for limit, _, _ in vol_table]
+    low = np.select(conditions, [lo for _, lo, _ in vol_table])
+    high = np.select(conditions, [hi for _, _, hi in vol_table])
 
+    open_factor = rng.uniform(open_lo, open_hi)
+    steps = 1 + rng.uniform(low, high)
+    prices = open_factor * np.concatenate(([1.0], np.cumprod(steps)))
+
+    return pd.DataFrame({'time': times.strftime('%H:%M'), 'price': prices})
+
+def _session_path(current_price, *path_args):
+    """Cached unit path from _build_path scaled to the live price"""
+    path = _build_path(*path_args)
+    path['price'] *= current_price
+    return path
+
+def _session_start(date, hour, minute=0):
+    """Naive datetime for a session start on the given date"""
+    return datetime(date.year, date.month, date.day, hour, minute)
+
+def generate_morning_session_data(current_price):
+    """Generate realistic morning session intraday data"""
+    try:
+        # Morning session: 9:45 AM to 12:00 PM (27 intervals of 5 minutes)
+        today = datetime.now(pakistan_tz).date()
+        return _session_path(current_price, _session_seed(today, 'morning'),
+                             _session_start(today, 9, 45), 28, 0.995, 1.005, _MORNING_VOL)
     except Exception as e:
         st.error(f"Error generating morning session data: {e}")
         return None
@@ -1720,37 +1657,9 @@ def generate_morning_session_data(current_price):
 def generate_half_day_data(current_price):
     """Generate half day data from 9:45 AM to 12:00 PM (first half completed)"""
     try:
-        import pytz
-        from datetime import time as dt_time
-        pkt = pytz.timezone('Asia/Karachi')
-        today = datetime.now(pkt).date()
-        
-        # Use seeded random generator for consistent daily graph
-        rng = random.Random(f"{today}_half_day")
-        
-        # Half day: 9:45 AM to 12:00 PM (2.25 hours = 27 intervals of 5 minutes)
-        start_time = datetime(today.year, today.month, today.day, 9, 45, 0)
-        times = []
-        prices = []
-        
-        base_price = current_price
-        
-        for i in range(28):  # 28 points for 27 intervals (9:45 to 12:00)
-            current_time = start_time + timedelta(minutes=5 * i)
-            times.append(current_time.strftime('%H:%M'))
-            
-            if i == 0:
-                # Opening price with slight gap
-                price = base_price * rng.uniform(0.995, 1.005)
-            else:
-                # Progressive morning movement
-                volatility = rng.uniform(-0.008, 0.010)
-                price = prices[-1] * (1 + volatility)
-            
-            prices.append(price)
-        
-        return pd.DataFrame({'time': times, 'price': prices})
-    
+        today = datetime.now(pakistan_tz).date()
+        return _session_path(current_price, _session_seed(today, 'half_day'),
+                             _session_start(today, 9, 45), 28, 0.995, 1.005, _MORNING_VOL)
     except Exception as e:
         st.error(f"Error generating half day data: {e}")
         return None
@@ -1758,37 +1667,10 @@ def generate_half_day_data(current_price):
 def generate_afternoon_session_data(current_price):
     """Generate realistic afternoon session intraday data"""
     try:
-        import pytz
-        from datetime import time as dt_time
-        pkt = pytz.timezone('Asia/Karachi')
-        today = datetime.now(pkt).date()
-        
-        # Use seeded random generator for consistent daily graph
-        rng = random.Random(f"{today}_afternoon")
-
-        # Afternoon session: 12:00 PM to 3:30 PM (3.5 hours = 42 intervals of 5 minutes)
-        start_time = datetime.combine(today, dt_time(12, 0))
-        times = []
-        prices = []
-
-        base_price = current_price
-
-        for i in range(43):  # 43 intervals for 42 periods
-            current_time = start_time + timedelta(minutes=5 * i)
-            times.append(current_time.strftime('%H:%M'))
-
-            if i == 0:
-                # Lunch break price
-                price = base_price * rng.uniform(0.997, 1.003)
-            else:
-                # Progressive afternoon movement with moderate volatility
-                volatility = rng.uniform(-0.006, 0.007)  # Moderate afternoon volatility
-                price = prices[-1] * (1 + volatility)
-
-            prices.append(price)
-
-        return pd.DataFrame({'time': times, 'price': prices})
-
+        # Afternoon session: 12:00 PM to 3:30 PM (42 intervals of 5 minutes)
+        today = datetime.now(pakistan_tz).date()
+        return _session_path(current_price, _session_seed(today, 'afternoon'),
+                             _session_start(today, 12), 43, 0.997, 1.003, _AFTERNOON_VOL)
     except Exception as e:
         st.error(f"Error generating afternoon session data: {e}")
         return None
@@ -1796,41 +1678,10 @@ def generate_afternoon_session_data(current_price):
 def generate_full_day_data(current_price):
     """Generate realistic full day intraday data (9:45 AM - 3:30 PM)"""
     try:
-        import pytz
-        pkt = pytz.timezone('Asia/Karachi')
-        today = datetime.now(pkt).date()
-        
-        # Use seeded random generator for consistent daily graph
-        rng = random.Random(f"{today}_full_day")
-        
-        # Full day: 9:45 AM to 3:30 PM (5 hours 45 minutes = 69 intervals of 5 minutes)
-        start_time = datetime(today.year, today.month, today.day, 9, 45, 0)
-        times = []
-        prices = []
-        
-        base_price = current_price
-        
-        for i in range(70): # 70 points for 69 intervals (9:45 to 15:30)
-            current_time = start_time + timedelta(minutes=5 * i)
-            times.append(current_time.strftime('%H:%M'))
-            
-            if i == 0:
-                price = base_price * rng.uniform(0.995, 1.005)
-            else:
-                # Volatility varies by time of day
-                hour = current_time.hour
-                if hour < 11: # Morning
-                    volatility = rng.uniform(-0.008, 0.010)
-                elif hour < 14: # Mid-day
-                    volatility = rng.uniform(-0.005, 0.005)
-                else: # Closing
-                    volatility = rng.uniform(-0.007, 0.008)
-                    
-                price = prices[-1] * (1 + volatility)
-            
-            prices.append(price)
-            
-        return pd.DataFrame({'time': times, 'price': prices})
+        # Full day: 9:45 AM to 3:30 PM (69 intervals of 5 minutes)
+        today = datetime.now(pakistan_tz).date()
+        return _session_path(current_price, _session_seed(today, 'full_day'),
+                             _session_start(today, 9, 45), 70, 0.995, 1.005, _FULL_DAY_VOL)
     except Exception as e:
         st.error(f"Error generating full day data: {e}")
         return None
@@ -1839,49 +1690,202 @@ def generate_next_day_full_data(current_price):
     """Generate realistic full day intraday data for the next day (9:45 AM - 3:30 PM)
     Refreshes at 3:00 PM daily with new forecast"""
     try:
-        import pytz
-        pkt = pytz.timezone('Asia/Karachi')
-        now = datetime.now(pkt)
+        now = datetime.now(pakistan_tz)
         tomorrow = (now + timedelta(days=1)).date()
-        
-        # Check if after 3:00 PM to determine seed (refreshes at 3:00 PM)
-        afternoon_cutoff = now.replace(hour=15, minute=0, second=0, microsecond=0)
-        is_after_3pm = now >= afternoon_cutoff
-        
+
         # Seed includes date and refresh indicator (changes at 3:00 PM)
-        seed_suffix = "post_3pm" if is_after_3pm else "pre_3pm"
-        rng = random.Random(f"{tomorrow}_full_day_{seed_suffix}")
-        
-        # Start at 9:45 AM for next day
-        start_time = datetime(tomorrow.year, tomorrow.month, tomorrow.day, 9, 45, 0)
-        times = []
-        prices = []
-        
-        base_price = current_price
-        
-        # 70 points for 69 intervals (9:45 to 15:30)
-        for i in range(70):
-            current_time = start_time + timedelta(minutes=5 * i)
-            times.append(current_time.strftime('%H:%M'))
-            
-            if i == 0:
-                price = base_price * rng.uniform(0.99, 1.01) # Next day opening gap
-            else:
-                hour = current_time.hour
-                if hour < 11:
-                    volatility = rng.uniform(-0.008, 0.010)
-                elif hour < 14:
-                    volatility = rng.uniform(-0.005, 0.005)
-                else:
-                    volatility = rng.uniform(-0.007, 0.008)
-                price = prices[-1] * (1 + volatility)
-            
-            prices.append(price)
-            
-        return pd.DataFrame({'time': times, 'price': prices})
+        seed_suffix = "post_3pm" if now.hour >= 15 else "pre_3pm"
+        return _session_path(current_price, _session_seed(tomorrow, f'next_day_{seed_suffix}'),
+                             _session_start(tomorrow, 9, 45), 70, 0.99, 1.01, _FULL_DAY_VOL)
     except Exception as e:
         st.error(f"Error generating next day full forecast data: {e}")
         return None
+
+# KSE-100 companies grouped by sector for the overview page
+_KSE100_SECTORS = {
+    "Oil & Gas": ["Oil & Gas Development Company Limited", "Pakistan Petroleum Limited", 
+                 "Pakistan Oilfields Limited", "Mari Petroleum Company Limited", 
+                 "Pakistan State Oil Company Limited"],
+    "Banking": ["Habib Bank Limited", "MCB Bank Limited", "United Bank Limited", 
+               "National Bank of Pakistan", "Allied Bank Limited", "Bank Alfalah Limited",
+               "Meezan Bank Limited", "JS Bank Limited", "Faysal Bank Limited", "Bank Al Habib Limited"],
+    "Fertilizer": ["Fauji Fertilizer Company Limited", "Engro Fertilizers Limited", 
+                  "Fauji Fertilizer Bin Qasim Limited", "Fatima Fertilizer Company Limited"],
+    "Cement": ["Lucky Cement Limited", "D.G. Khan Cement Company Limited", 
+              "Maple Leaf Cement Factory Limited", "Pioneer Cement Limited",
+              "Kohat Cement Company Limited", "Attock Cement Pakistan Limited", "Cherat Cement Company Limited"],
+    "Power & Energy": ["Hub Power Company Limited", "K-Electric Limited", 
+                      "Kot Addu Power Company Limited", "Nishat Power Limited", "Lotte Chemical Pakistan Limited"],
+    "Technology": ["Systems Limited", "TRG Pakistan Limited", "NetSol Technologies Limited", 
+                  "Avanceon Limited", "Pakistan Telecommunication Company Limited"],
+    "Food & FMCG": ["Nestle Pakistan Limited", "Unilever Pakistan Limited", 
+                   "Colgate-Palmolive Pakistan Limited", "National Foods Limited", 
+                   "Murree Brewery Company Limited", "Frieslandcampina Engro Pakistan Limited"],
+    "Automotive": ["Indus Motor Company Limited", "Pak Suzuki Motor Company Limited", 
+                  "Atlas Honda Limited", "Millat Tractors Limited", "Hinopak Motors Limited"],
+    "Chemical & Pharma": ["Engro Corporation Limited", "ICI Pakistan Limited", 
+                         "The Searle Company Limited", "GlaxoSmithKline Pakistan Limited", 
+                         "Abbott Laboratories Pakistan Limited"],
+    "Others": ["Packages Limited", "Interloop Limited", "Aisha Steel Mills Limited",
+              "Lucky Core Industries Limited", "Service Industries Limited", "Dawood Hercules Corporation Limited"]
+}
+
+_SECTOR_CARD_TEMPLATE = """
+<div style='background-color: {color}15; padding: 12px; border-radius: 8px; 
+            border-left: 4px solid {color}; margin-bottom: 10px; min-height: 120px;'>
+    <strong style='font-size: 14px; color: #333;'>{symbol}</strong><br>
+    <small style='color: #666; font-size: 11px;'>{short_name}...</small><br>
+    <h4 style='color: {color}; margin: 5px 0;'>PKR {price_text}</h4>
+    <small style='color: {color};'>{arrow} {change:+.2f} ({change_pct:+.2f}%)</small><br>
+    <small style='color: #888; font-size: 10px;'>
+        {source} â€¢ {updated}
+    </small>
+</div>
+"""
+
+@st.cache_data(ttl=300, max_entries=4, show_spinner=False)
+def _summarize_companies(fetch_id, _companies):
+    """Market and per-sector price stats for one companies fetch, keyed by its fetch id"""
+    prices = _companies['current_price'].astype(float).to_numpy()
+    sources = _companies['source'].fillna('unknown')
+    price_by_name = dict(zip(_companies.index, prices))
+
+    by_sector = {}
+    for sector, members in _KSE100_SECTORS.items():
+        sector_prices = np.array([price_by_name[c] for c in members if c in price_by_name])
+        if sector_prices.size:
+            by_sector[sector] = {
+                'count': sector_prices.size,
+                'avg': np.nanmean(sector_prices),
+                'max': np.nanmax(sector_prices),
+                'min': np.nanmin(sector_prices)
+            }
+
+    return {
+        'total': len(prices),
+        'avg': np.nansum(prices) / len(prices) if len(prices) else 0.0,
+        'by_source': dict(Counter(sources)),
+        'by_sector': by_sector
+    }
+
+@st.cache_data(ttl=300, max_entries=4, show_spinner=False)
+def _companies_export_csv(fetch_id, _companies):
+    """CSV text for one companies fetch, keyed by its fetch id; _companies is indexed by company name"""
+    export_df = pd.DataFrame({
+        'Company': _companies.index.to_numpy(),
+        'Symbol': _companies['symbol'].to_numpy(),
+        'Current Price (PKR)': _companies['current_price'].to_numpy(),
+        'Source': _companies['source'].to_numpy(),
+        'Timestamp': pd.to_datetime(_companies['timestamp']).dt.strftime('%Y-%m-%d %H:%M:%S').to_numpy()
+    })
+    return export_df.to_csv(index=False)
+
+@_fragment
+def _sector_overview(df_companies, summary, companies_data):
+    """Sector card grid and quick forecast; its widgets rerun only this section"""
+    # Render only the selected sector rather than every sector tab
+    sector_name = st.radio("Sector", list(_KSE100_SECTORS.keys()), horizontal=True, key="overview_sector")
+    present_companies = pd.Index(_KSE100_SECTORS[sector_name]).intersection(df_companies.index, sort=False)
+    sector_df = df_companies.loc[present_companies]
+
+    st.subheader(f"{sector_name} Sector")
+
+    # Create columns for better layout
+    cols = st.columns(3)
+
+    # Mock changes for every card in one draw (no historical comparison available)
+    mock_changes = _RNG.uniform(-5, 5, len(sector_df))
+
+    # Build each column's cards as one HTML block so a sector is three markdown elements
+    column_cards = [[], [], []]
+    for col_idx, company_info in enumerate(sector_df.itertuples()):
+        current_price = company_info.current_price
+        change = mock_changes[col_idx]
+        color = "green" if change > 0 else "red" if change < 0 else "gray"
+        column_cards[col_idx % 3].append(_SECTOR_CARD_TEMPLATE.format_map({
+            'color': color,
+            'symbol': company_info.symbol,
+            'short_name': company_info.Index[:30],
+            'price_text': _fmt_price(current_price),
+            'arrow': "â†—" if change > 0 else "â†˜" if change < 0 else "â†’",
+            'change': change,
+            'change_pct': (change / current_price) * 100,
+            'source': company_info.source.upper(),
+            'updated': company_info.timestamp.strftime('%H:%M:%S')
+        }))
+
+    for col_idx, col in enumerate(cols):
+        with col:
+            st.markdown("".join(column_cards[col_idx]), unsafe_allow_html=True)
+
+    # One picker and submit instead of a Forecast button per card
+    forecast_company = st.selectbox("Forecast which?", list(sector_df.index),
+                                    format_func=sector_df['symbol'].get, key="overview_forecast_company")
+    if st.button("ðŸ“ˆ Forecast", key="overview_forecast_submit") and forecast_company:
+        st.session_state.quick_forecast_company = forecast_company
+
+    # Sector summary statistics
+    sector_stats = summary['by_sector'].get(sector_name)
+    if sector_stats:
+        st.markdown("---")
+        col1, col2, col3, col4 = st.columns(4)
+        with col1:
+            st.metric("Companies", sector_stats['count'])
+        with col2:
+            st.metric("Average Price", f"PKR {sector_stats['avg']:,.2f}")
+        with col3:
+            st.metric("Highest", f"PKR {sector_stats['max']:,.2f}")
+        with col4:
+            st.metric("Lowest", f"PKR {sector_stats['min']:,.2f}")
+
+    # Quick forecast section
+    if hasattr(st.session_state, 'quick_forecast_company') and st.session_state.quick_forecast_company:
+        company_name = st.session_state.quick_forecast_company
+        if company_name in companies_data:
+            st.markdown("---")
+            st.subheader(f"ðŸ“Š Quick Forecast: {companies_data[company_name]['symbol']}")
+
+            # Generate and display forecast
+            historical_data = companies_data[company_name]['historical_data']
+            forecast = _cached_price_forecast(company_name, 1, _last_bar(historical_data), historical_data)
+
+            if forecast is not None and not forecast.empty:
+                # Create forecast chart
+                fig = go.Figure()
+
+                # Historical data
+                recent_data = historical_data.tail(10)
+                fig.add_trace(go.Scatter(
+                    x=recent_data['date'],
+                    y=recent_data['close'],
+                    mode='lines+markers',
+                    name='Historical Prices',
+                    line=dict(color='blue')
+                ))
+
+                # Forecast
+                fig.add_trace(go.Scatter(
+                    x=forecast['ds'],
+                    y=forecast['yhat'],
+                    mode='lines+markers',
+                    name='Forecast',
+                    line=dict(color='red', dash='dash')
+                ))
+
+                fig.update_layout(
+                    title=f"{company_name} - Price Forecast",
+                    xaxis_title="Date",
+                    yaxis_title="Price (PKR)",
+                    height=400
+                )
+
+                st.plotly_chart(fig, use_container_width=True)
+
+                # Clear the forecast selection
+                if st.button("âœ– Close Forecast"):
+                    del st.session_state.quick_forecast_company
+                    st.rerun()
+
 def display_all_companies_live_prices():
     """Display live prices for all KSE-100 companies with sector-wise organization"""
     
@@ -1891,58 +1895,57 @@ def display_all_companies_live_prices():
     # Add refresh button
     col1, col2 = st.columns([1, 4])
     with col1:
-        if st.button("ðŸ”„ Refresh All Data", use_container_width=True):
-            st.rerun()
+        refresh_clicked = st.button("ðŸ”„ Refresh All Data", use_container_width=True)
     
-    # Fetch all companies data
-    with st.spinner("Fetching comprehensive brand data for all KSE-100 companies..."):
-        companies_data = st.session_state.data_fetcher.fetch_all_companies_live_data()
+    # Fetch all companies data on refresh, otherwise reuse this session's fetch for 5 minutes
+    last_fetch = st.session_state.get('overview_last_fetch')
+    if refresh_clicked or not last_fetch or (datetime.now() - last_fetch).total_seconds() >= 300:
+        with st.spinner("Fetching comprehensive brand data for all KSE-100 companies..."):
+            st.session_state.overview_companies_data = get_data_fetcher().fetch_all_companies_live_data()
+        st.session_state.overview_last_fetch = datetime.now()
+        # Identifies this fetch in the summary caches, which are shared across sessions
+        st.session_state.overview_fetch_id = uuid.uuid4().hex
+    companies_data = st.session_state.overview_companies_data
+    fetch_id = st.session_state.overview_fetch_id
     
     if companies_data:
         # Create comprehensive overview table
         st.subheader("ðŸ“Š Complete KSE-100 Brand Data Overview")
         
-        # Prepare data for overview table
-        overview_data = []
-        for company_name, data in companies_data.items():
-            current_price = data.get('current_price', 0)
-            source = data.get('source', 'unknown')
-            symbol = data.get('symbol', 'N/A')
-            
-            # Format price display
-            if current_price and current_price > 0:
-                price_display = f"PKR {current_price:,.2f}"
-            else:
-                price_display = "N/A"
-            
-            # Format source display
-            if source == 'estimated_range_fallback':
-                source_display = "ðŸ“Š Estimated"
-            elif source == 'unavailable':
-                source_display = "âŒ Unavailable"
-            else:
-                source_display = f"âœ… {source}"
+        # Normalize companies_data once; the overview, counts and sector views derive from it
+        df_companies = pd.DataFrame.from_dict(companies_data, orient='index')
+        price_values = df_companies['current_price'].fillna(0.0).to_numpy(dtype=np.float64)
+        source_col = df_companies['source'].fillna('unknown')
+        
+        # Aggregates are cached per fetch so unrelated widget reruns skip them
+        summary = _summarize_companies(fetch_id, df_companies)
+        source_counts = summary['by_source']
+        
+        # The full table ships every row to the browser, so render it on demand
+        if st.checkbox("Show full company table", key="overview_show_table"):
+            # Format price, source and time columns vectorized
+            prices = pd.Series(price_values).map('PKR {:,.2f}'.format).where(price_values > 0, "N/A")
+            sources = source_col.map({
+                'estimated_range_fallback': "ðŸ“Š Estimated",
+                'unavailable': "âŒ Unavailable"
+            }).fillna("âœ… " + source_col)
+            updates = pd.to_datetime(df_companies['timestamp']).dt.strftime('%H:%M:%S')
             
-            overview_data.append({
-                'Company': company_name,
-                'Symbol': symbol,
-                'Current Price': price_display,
-                'Data Source': source_display,
-                'Last Updated': data.get('timestamp', datetime.now()).strftime('%H:%M:%S')
-            })
-        
-        # Create DataFrame and display
-        df_overview = pd.DataFrame(overview_data)
-        st.dataframe(df_overview, use_container_width=True, height=400)
+            # Create DataFrame and display
+            df_overview = pd.DataFrame({
+                'Company': df_companies.index.to_numpy(),
+                'Symbol': df_companies['symbol'].to_numpy(),
+                'Current Price': prices.to_numpy(),
+                'Data Source': sources.to_numpy(),
+                'Last Updated': updates.to_numpy()
+            }, copy=False)
+            st.dataframe(df_overview, use_container_width=True, height=400)
         
         # Add summary statistics
-        total_companies = len(companies_data)
-        live_data_count = sum(1 for data in companies_data.values() 
-                             if data.get('source') not in ['estimated_range_fallback', 'unavailable'])
-        estimated_count = sum(1 for data in companies_data.values() 
-                             if data.get('source') == 'estimated_range_fallback')
-        unavailable_count = sum(1 for data in companies_data.values() 
-                               if data.get('source') == 'unavailable')
+        total_companies = summary['total']
+        estimated_count = source_counts.get('estimated_range_fallback', 0)
+        unavailable_count = source_counts.get('unavailable', 0)
+        live_data_count = total_companies - estimated_count - unavailable_count
         
         # Display summary metrics
         col1, col2, col3, col4 = st.columns(4)
@@ -1957,117 +1960,14 @@ def display_all_companies_live_prices():
         
         st.markdown("---")
         
-        # Organize companies by sectors
-        sectors = {
-            "Oil & Gas": ["Oil & Gas Development Company Limited", "Pakistan Petroleum Limited", 
-                         "Pakistan Oilfields Limited", "Mari Petroleum Company Limited", 
-                         "Pakistan State Oil Company Limited"],
-            "Banking": ["Habib Bank Limited", "MCB Bank Limited", "United Bank Limited", 
-                       "National Bank of Pakistan", "Allied Bank Limited", "Bank Alfalah Limited",
-                       "Meezan Bank Limited", "JS Bank Limited", "Faysal Bank Limited", "Bank Al Habib Limited"],
-            "Fertilizer": ["Fauji Fertilizer Company Limited", "Engro Fertilizers Limited", 
-                          "Fauji Fertilizer Bin Qasim Limited", "Fatima Fertilizer Company Limited"],
-            "Cement": ["Lucky Cement Limited", "D.G. Khan Cement Company Limited", 
-                      "Maple Leaf Cement Factory Limited", "Pioneer Cement Limited",
-                      "Kohat Cement Company Limited", "Attock Cement Pakistan Limited", "Cherat Cement Company Limited"],
-            "Power & Energy": ["Hub Power Company Limited", "K-Electric Limited", 
-                              "Kot Addu Power Company Limited", "Nishat Power Limited", "Lotte Chemical Pakistan Limited"],
-            "Technology": ["Systems Limited", "TRG Pakistan Limited", "NetSol Technologies Limited", 
-                          "Avanceon Limited", "Pakistan Telecommunication Company Limited"],
-            "Food & FMCG": ["Nestle Pakistan Limited", "Unilever Pakistan Limited", 
-                           "Colgate-Palmolive Pakistan Limited", "National Foods Limited", 
-                           "Murree Brewery Company Limited", "Frieslandcampina Engro Pakistan Limited"],
-            "Automotive": ["Indus Motor Company Limited", "Pak Suzuki Motor Company Limited", 
-                          "Atlas Honda Limited", "Millat Tractors Limited", "Hinopak Motors Limited"],
-            "Chemical & Pharma": ["Engro Corporation Limited", "ICI Pakistan Limited", 
-                                 "The Searle Company Limited", "GlaxoSmithKline Pakistan Limited", 
-                                 "Abbott Laboratories Pakistan Limited"],
-            "Others": ["Packages Limited", "Interloop Limited", "Aisha Steel Mills Limited",
-                      "Lucky Core Industries Limited", "Service Industries Limited", "Dawood Hercules Corporation Limited"]
-        }
-        
-        # Create tabs for each sector
-        sector_tabs = st.tabs(list(sectors.keys()))
-        
-        for i, (sector_name, sector_companies) in enumerate(sectors.items()):
-            with sector_tabs[i]:
-                st.subheader(f"{sector_name} Sector")
-                
-                # Create columns for better layout
-                cols = st.columns(3)
-                col_idx = 0
-                
-                for company_name in sector_companies:
-                    if company_name in companies_data:
-                        company_info = companies_data[company_name]
-                        
-                        with cols[col_idx % 3]:
-                            # Company card
-                            current_price = company_info['current_price']
-                            symbol = company_info['symbol']
-                            source = company_info['source']
-                            timestamp = company_info['timestamp']
-                            
-                            # Calculate mock change (since we don't have historical comparison)
-                            import random
-                            change = random.uniform(-5, 5)
-                            change_pct = (change / current_price) * 100
-                            color = "green" if change > 0 else "red" if change < 0 else "gray"
-                            arrow = "â†—" if change > 0 else "â†˜" if change < 0 else "â†’"
-                            
-                            # Display company card
-                            st.markdown(f"""
-                            <div style='background-color: {color}15; padding: 12px; border-radius: 8px; 
-                                        border-left: 4px solid {color}; margin-bottom: 10px; min-height: 120px;'>
-                                <strong style='font-size: 14px; color: #333;'>{symbol}</strong><br>
-                                <small style='color: #666; font-size: 11px;'>{company_name[:30]}...</small><br>
-                                <h4 style='color: {color}; margin: 5px 0;'>PKR {current_price:,.2f}</h4>
-                                <small style='color: {color};'>{arrow} {change:+.2f} ({change_pct:+.2f}%)</small><br>
-                                <small style='color: #888; font-size: 10px;'>
-                                    {source.upper()} â€¢ {timestamp.strftime('%H:%M:%S')}
-                                </small>
-                            </div>
-                            """, unsafe_allow_html=True)
-                            
-                            # Quick forecast button
-                            if st.button(f"ðŸ“ˆ Forecast {symbol}", key=f"forecast_{symbol}"):
-                                st.session_state.quick_forecast_company = company_name
-                                st.rerun()
-                        
-                        col_idx += 1
-                
-                # Sector summary statistics
-                sector_companies_data = [companies_data[comp] for comp in sector_companies if comp in companies_data]
-                if sector_companies_data:
-                    total_value = sum(comp['current_price'] for comp in sector_companies_data)
-                    avg_price = total_value / len(sector_companies_data)
-                    max_price = max(comp['current_price'] for comp in sector_companies_data)
-                    min_price = min(comp['current_price'] for comp in sector_companies_data)
-                    
-                    st.markdown("---")
-                    col1, col2, col3, col4 = st.columns(4)
-                    with col1:
-                        st.metric("Companies", len(sector_companies_data))
-                    with col2:
-                        st.metric("Average Price", f"PKR {avg_price:,.2f}")
-                    with col3:
-                        st.metric("Highest", f"PKR {max_price:,.2f}")
-                    with col4:
-                        st.metric("Lowest", f"PKR {min_price:,.2f}")
+        # Sector grid and quick forecast rerun on their own
+        _sector_overview(df_companies, summary, companies_data)
         
         # Overall market summary
         st.markdown("---")
         st.subheader("ðŸ“ˆ Market Summary")
         
-        total_companies = len(companies_data)
-        total_market_value = sum(comp['current_price'] for comp in companies_data.values())
-        avg_market_price = total_market_value / total_companies if total_companies > 0 else 0
-        
-        # Get data sources breakdown
-        live_sources = {}
-        for comp in companies_data.values():
-            source = comp['source']
-            live_sources[source] = live_sources.get(source, 0) + 1
+        avg_market_price = summary['avg']
         
         col1, col2, col3 = st.columns(3)
         
@@ -2077,7 +1977,7 @@ def display_all_companies_live_prices():
         
         with col2:
             st.write("**Data Sources:**")
-            for source, count in live_sources.items():
+            for source, count in source_counts.items():
                 st.write(f"â€¢ {source.upper()}: {count} companies")
         
         with col3:
@@ -2102,19 +2002,8 @@ def display_all_companies_live_prices():
         
         with col2:
             if st.button("ðŸ’¾ Export All Prices", use_container_width=True):
-                # Create export DataFrame
-                export_data = []
-                for company_name, data in companies_data.items():
-                    export_data.append({
-                        'Company': company_name,
-                        'Symbol': data['symbol'],
-                        'Current Price (PKR)': data['current_price'],
-                        'Source': data['source'],
-                        'Timestamp': data['timestamp'].strftime('%Y-%m-%d %H:%M:%S')
-                    })
-                
-                export_df = pd.DataFrame(export_data)
-                csv = export_df.to_csv(index=False)
+                # Built once per fetch, so repeated clicks reuse the same CSV
+                csv = _companies_export_csv(fetch_id, df_companies)
                 
                 st.download_button(
                     label="Download CSV",
@@ -2123,54 +2012,6 @@ def display_all_companies_live_prices():
                     mime="text/csv",
                     key="kse100_all_companies_export_csv"
                 )
-        
-        # Quick forecast section
-        if hasattr(st.session_state, 'quick_forecast_company') and st.session_state.quick_forecast_company:
-            company_name = st.session_state.quick_forecast_company
-            if company_name in companies_data:
-                st.markdown("---")
-                st.subheader(f"ðŸ“Š Quick Forecast: {companies_data[company_name]['symbol']}")
-                
-                # Generate and display forecast
-                historical_data = companies_data[company_name]['historical_data']
-                forecast = st.session_state.forecaster.forecast_stock(historical_data, days_ahead=1)
-                
-                if forecast is not None and not forecast.empty:
-                    # Create forecast chart
-                    fig = go.Figure()
-                    
-                    # Historical data
-                    recent_data = historical_data.tail(10)
-                    fig.add_trace(go.Scatter(
-                        x=recent_data['date'],
-                        y=recent_data['close'],
-                        mode='lines+markers',
-                        name='Historical Prices',
-                        line=dict(color='blue')
-                    ))
-                    
-                    # Forecast
-                    fig.add_trace(go.Scatter(
-                        x=forecast['ds'],
-                        y=forecast['yhat'],
-                        mode='lines+markers',
-                        name='Forecast',
-                        line=dict(color='red', dash='dash')
-                    ))
-                    
-                    fig.update_layout(
-                        title=f"{company_name} - Price Forecast",
-                        xaxis_title="Date",
-                        yaxis_title="Price (PKR)",
-                        height=400
-                    )
-                    
-                    st.plotly_chart(fig, use_container_width=True)
-                    
-                    # Clear the forecast selection
-                    if st.button("âœ– Close Forecast"):
-                        del st.session_state.quick_forecast_company
-                        st.rerun()
     
     else:
         st.error("Unable to fetch company data. Please try refreshing the page.")
@@ -2186,22 +2027,13 @@ def display_live_market_dashboard():
     count = 1  # Placeholder - auto-refresh disabled until package installed
     
     # Define symbol_options for company selection
-    if hasattr(st.session_state, 'data_fetcher'):
-        symbol_options = st.session_state.data_fetcher.get_kse100_companies()
-    else:
-        # Fallback to basic symbol options if data_fetcher not available
-        symbol_options = {
-            'KSE-100': 'KSE-100 Index', 'HBL': 'Habib Bank Limited', 'UBL': 'United Bank Limited',
-            'MCB': 'MCB Bank Limited', 'NBP': 'National Bank of Pakistan', 'OGDC': 'Oil & Gas Development Co',
-            'PPL': 'Pakistan Petroleum', 'POL': 'Pakistan Oilfields', 'LUCK': 'Lucky Cement',
-            'ENGRO': 'Engro Corporation', 'HUBC': 'Hub Power Company', 'TRG': 'TRG Pakistan'
-        }
+    symbol_options = get_data_fetcher().get_kse100_companies()
     
     # Get accurate Pakistan market status
     market_status = format_market_status()
     
     # Initialize current_time_pkt for use throughout the function
-    pkt = pytz.timezone('Asia/Karachi')
+    pkt = pakistan_tz
     current_time_pkt = datetime.now(pkt)
     
     # Market status indicator with Pakistan time
@@ -2227,7 +2059,7 @@ def display_live_market_dashboard():
     st.subheader("ðŸ“ˆ KSE-100 Index - Live")
     
     # Fetch live KSE-100 price
-    live_kse_data = st.session_state.data_fetcher.get_live_psx_price("KSE-100")
+    live_kse_data = get_data_fetcher().get_live_psx_price("KSE-100")
     
     if live_kse_data:
         current_price = live_kse_data['price']
@@ -2315,18 +2147,17 @@ def display_live_market_dashboard():
         # Get historical data for forecasting
         # Try enhanced fetcher first for historical data
         historical_data = None
-        if hasattr(st.session_state, 'enhanced_psx_fetcher'):
-            historical_data = st.session_state.enhanced_psx_fetcher.fetch_kse100_historical("3mo")
-            if historical_data is not None and not historical_data.empty:
-                st.success("ðŸ“¡ Fetched historical data from Yahoo Finance")
+        historical_data = get_enhanced_psx_fetcher().fetch_kse100_historical("3mo")
+        if historical_data is not None and not historical_data.empty:
+            st.success("ðŸ“¡ Fetched historical data from Yahoo Finance")
 
         # Fallback to data_fetcher if enhanced fails
-        if (historical_data is None or historical_data.empty) and hasattr(st.session_state, 'data_fetcher'):
-            historical_data = st.session_state.data_fetcher.fetch_kse100_data()
+        if historical_data is None or historical_data.empty:
+            historical_data = get_data_fetcher().fetch_kse100_data()
 
         if historical_data is not None and not historical_data.empty:
             # Generate forecast for next trading day
-            forecast = st.session_state.forecaster.forecast_stock(historical_data, days_ahead=1)
+            forecast = _cached_price_forecast("KSE-100", 1, _last_bar(historical_data), historical_data)
             
             if forecast is not None and not forecast.empty:
                 tomorrow = (current_time + timedelta(days=1)).replace(hour=9, minute=30)
@@ -2400,8 +2231,10 @@ def display_live_market_dashboard():
     company_search = st.text_input("Search companies to track:", key="company_search")
 
     if company_search:
+        query = company_search.lower()
+        search_keys = _company_search_keys()
         filtered_companies = {k: v for k, v in all_companies.items()
-                            if company_search.lower() in k.lower() or company_search.lower() in v.lower()}
+                              if query in search_keys[k][0] or query in search_keys[k][1]}
         available_companies = filtered_companies
     else:
         available_companies = all_companies
@@ -2422,27 +2255,27 @@ def display_live_market_dashboard():
         
         # Create tabs for each selected brand
         if len(selected_brands) <= 5:
-            brand_tabs = st.tabs([companies[brand] for brand in selected_brands])
+            brand_symbols = [available_companies[brand] for brand in selected_brands]
+            brand_tabs = st.tabs(brand_symbols)
+            mock_changes = _RNG.uniform(-2, 2, len(selected_brands))  # Mock daily changes
             
             for i, brand_name in enumerate(selected_brands):
                 with brand_tabs[i]:
-                    symbol = companies[brand_name]
+                    symbol = brand_symbols[i]
                     
                     # Get live price for this company using enhanced PSX fetcher
                     live_price = None
                     try:
-                        if hasattr(st.session_state, 'enhanced_psx_fetcher'):
-                            live_price = st.session_state.enhanced_psx_fetcher.get_live_price(symbol)
+                        live_price = get_enhanced_psx_fetcher().get_live_price(symbol)
                     except Exception as e:
                         live_price = None
                     
                     # Fallback to data_fetcher if enhanced fetcher returns None or invalid price
                     if not live_price or not live_price.get('price'):
-                        if hasattr(st.session_state, 'data_fetcher'):
-                            try:
-                                live_price = st.session_state.data_fetcher.get_live_company_price(symbol)
-                            except:
-                                pass
+                        try:
+                            live_price = get_data_fetcher().get_live_company_price(symbol)
+                        except:
+                            pass
                     
                     # Fallback to all_kse100_data if available
                     if not live_price and hasattr(st.session_state, 'all_kse100_data') and st.session_state.all_kse100_data:
@@ -2461,7 +2294,7 @@ def display_live_market_dashboard():
                             st.metric(
                                 f"{symbol} Live Price",
                                 f"PKR {live_price['price']:,.2f}",
-                                f"{np.random.uniform(-2, 2):+.2f}%"  # Mock daily change
+                                f"{mock_changes[i]:+.2f}%"  # Mock daily change
                             )
                             
                             st.write(f"**Source:** {live_price['source'].upper()}")
@@ -2473,9 +2306,9 @@ def display_live_market_dashboard():
                         with col2:
                             # Quick forecast for this company
                             if st.button(f"ðŸ“Š Forecast {symbol}", key=f"forecast_btn_{symbol}"):
-                                company_data = st.session_state.data_fetcher.fetch_company_data(brand_name)
+                                company_data = get_data_fetcher().fetch_company_data(brand_name)
                                 if company_data is not None and not company_data.empty:
-                                    forecast = st.session_state.forecaster.forecast_stock(company_data, days_ahead=1)
+                                    forecast = _cached_price_forecast(brand_name, 1, _last_bar(company_data), company_data)
                                     
                                     if forecast is not None and not forecast.empty:
                                         pred_price = forecast['yhat'].iloc[-1]
@@ -2487,16 +2320,20 @@ def display_live_market_dashboard():
         else:
             # Display as cards if more than 5 companies
             cols = st.columns(3)
-            for i, brand_name in enumerate(selected_brands):
-                symbol = companies[brand_name]
-                live_price = st.session_state.data_fetcher.get_live_company_price(symbol)
+            mock_changes = _RNG.uniform(-3, 3, len(selected_brands))
+            
+            # Resolve symbols once and fetch all card prices in one concurrent batch
+            brand_symbols = [available_companies[brand] for brand in selected_brands]
+            live_prices = get_data_fetcher().get_live_company_prices(brand_symbols)
+            for i, symbol in enumerate(brand_symbols):
+                live_price = live_prices[symbol]
                 
                 with cols[i % 3]:
                     if live_price and live_price.get('price') is not None:
                         st.metric(
                             symbol,
                             f"PKR {live_price['price']:,.2f}",
-                            f"{np.random.uniform(-3, 3):+.2f}%"
+                            f"{mock_changes[i]:+.2f}%"
                         )
                     else:
                         st.metric(
@@ -2525,6 +2362,14 @@ def display_live_market_dashboard():
 
 def generate_intraday_market_data(current_price, is_market_open):
     """Generate realistic intraday market data for today"""
+    # Cached unit path scaled to the live price, as _session_path does for the sessions
+    frame = _intraday_market_frame(is_market_open, int(time.time() // 300))
+    frame['price'] *= current_price
+    return frame
+
+@st.cache_data(ttl=300, max_entries=4, show_spinner=False)
+def _intraday_market_frame(is_market_open, bucket):
+    """Unit intraday path, reused within a 5-minute bucket to match the auto-refresh cadence"""
     today = datetime.now().replace(hour=9, minute=30, second=0, microsecond=0)
 
     if is_market_open:
@@ -2535,22 +2380,15 @@ def generate_intraday_market_data(current_price, is_market_open):
         end_time = today.replace(hour=15, minute=0)
 
     # Create 5-minute intervals
-    times = []
-    prices = []
-
-    current_time = today
-    price = current_price * (1 + np.random.uniform(-0.01, 0.01))  # Start price
-
-    while current_time <= end_time:
-        times.append(current_time)
-
-        # Add realistic price movement (Â±0.5% per 5-minute interval)
-        change = np.random.uniform(-0.005, 0.005)
-        price = price * (1 + change)
-        prices.append(price)
+    times = pd.date_range(today, end_time, freq='5min')
+    price = 1 + np.random.uniform(-0.01, 0.01)  # Start price relative to the live price
 
-        # Ensure proper datetime addition
-        current_time = current_time + timedelta(minutes=5)
+    # Add realistic price movement (Â±0.5% per 5-minute interval)
+    # Compound in place: one buffer instead of temporaries for 1 + changes, cumprod and the scale
+    prices = np.random.uniform(-0.005, 0.005, len(times))
+    prices += 1
+    np.cumprod(prices, out=prices)
+    prices *= price
 
     return pd.DataFrame({
         'time': times,
@@ -2627,13 +2465,13 @@ def display_file_upload_prediction():
                     with st.spinner("Generating predictions..."):
                         # Generate forecast
                         if model_type == "Prophet (Advanced)":
-                            forecast = st.session_state.forecaster.forecast_stock(
+                            forecast = get_forecaster().forecast_stock(
                                 custom_data, 
                                 days_ahead=forecast_days
                             )
                         else:
                             # Use ensemble forecasting for other models
-                            forecast_results = st.session_state.forecaster.forecast_with_multiple_models(
+                            forecast_results = get_forecaster().forecast_with_multiple_models(
                                 custom_data, 
                                 days_ahead=forecast_days
                             )
@@ -2822,20 +2660,19 @@ def display_five_minute_live_predictions():
 
     from utils import format_market_status
     from datetime import datetime, timedelta
-    import pytz
     
     # Initialize current_time_pkt at the beginning for use throughout the function
-    pkt = pytz.timezone('Asia/Karachi')
+    pkt = pakistan_tz
     current_time_pkt = datetime.now(pkt)
 
     # Auto-refresh logic
     if 'last_refresh_15min' not in st.session_state:
-        pkt = pytz.timezone('Asia/Karachi')
+        pkt = pakistan_tz
         st.session_state.last_refresh_15min = datetime.now(pkt)
     
     # Initialize 15-minute session refresh timer
     if 'last_15min_session_refresh' not in st.session_state:
-        pkt = pytz.timezone('Asia/Karachi')
+        pkt = pakistan_tz
         st.session_state.last_15min_session_refresh = datetime.now(pkt)
     
     # Initialize auto-refresh start time tracking
@@ -2856,7 +2693,7 @@ def display_five_minute_live_predictions():
     if auto_refresh_enabled:
         # Record start time when auto-refresh is first enabled
         if st.session_state.auto_refresh_start_time is None:
-            pkt = pytz.timezone('Asia/Karachi')
+            pkt = pakistan_tz
             st.session_state.auto_refresh_start_time = datetime.now(pkt)
             st.session_state.last_refresh_15min = datetime.now(pkt)
     else:
@@ -2865,7 +2702,7 @@ def display_five_minute_live_predictions():
 
     # Check for auto-refresh
     if auto_refresh_enabled:
-        pkt = pytz.timezone('Asia/Karachi')
+        pkt = pakistan_tz
         now_pkt = datetime.now(pkt)
         
         # Ensure last_refresh_15min is timezone-aware
@@ -2892,7 +2729,7 @@ def display_five_minute_live_predictions():
     
     with col3:
         if auto_refresh_enabled:
-            pkt = pytz.timezone('Asia/Karachi')
+            pkt = pakistan_tz
             now_pkt = datetime.now(pkt)
             
             # Ensure last_refresh_15min is timezone-aware
@@ -2906,7 +2743,7 @@ def display_five_minute_live_predictions():
         else:
             # Manual refresh button
             if st.button("ðŸ”„ Refresh Market Data", type="primary", key="manual_refresh_15min"):
-                pkt = pytz.timezone('Asia/Karachi')
+                pkt = pakistan_tz
                 st.session_state.last_refresh_15min = datetime.now(pkt)
                 st.rerun()
             st.info("ðŸ“Š **Manual Refresh Mode**")
@@ -3085,19 +2922,15 @@ def display_five_minute_live_predictions():
         # Get live price using enhanced PSX fetcher for comprehensive KSE-100 coverage
         try:
             # First try enhanced PSX fetcher with improved error handling
-            if hasattr(st.session_state, 'enhanced_psx_fetcher'):
-                live_price_data = st.session_state.enhanced_psx_fetcher.get_live_price(selected_symbol)
-                if live_price_data:
-                    live_price = {
-                        'price': live_price_data['price'],
-                        'source': live_price_data['source'],
-                        'timestamp': live_price_data['timestamp']
-                    }
-                else:
-                    live_price = None
+            live_price_data = get_enhanced_psx_fetcher().get_live_price(selected_symbol)
+            if live_price_data:
+                live_price = {
+                    'price': live_price_data['price'],
+                    'source': live_price_data['source'],
+                    'timestamp': live_price_data['timestamp']
+                }
             else:
-                # Fallback to regular data fetcher
-                live_price = st.session_state.data_fetcher.get_live_company_price(selected_symbol)
+                live_price = None
 
             # If no live price, try to get from all_kse100_data if available
             if not live_price and hasattr(st.session_state, 'all_kse100_data') and st.session_state.all_kse100_data:
@@ -3110,8 +2943,8 @@ def display_five_minute_live_predictions():
                     }
 
             # If still no live price, use sector-based estimate as final fallback
-            if not live_price and hasattr(st.session_state, 'enhanced_psx_fetcher'):
-                estimated_price = st.session_state.enhanced_psx_fetcher._get_sector_based_estimate(selected_symbol)
+            if not live_price:
+                estimated_price = get_enhanced_psx_fetcher()._get_sector_based_estimate(selected_symbol)
                 live_price = {
                     'price': estimated_price,
                     'source': 'sector_estimate_fallback',
@@ -3121,17 +2954,14 @@ def display_five_minute_live_predictions():
         except Exception as e:
             st.warning(f"Error fetching live price: {str(e)}")
             # Provide fallback estimate
-            if hasattr(st.session_state, 'enhanced_psx_fetcher'):
-                estimated_price = st.session_state.enhanced_psx_fetcher._get_sector_based_estimate(selected_symbol)
-                live_price = {
-                    'price': estimated_price,
-                    'source': 'error_fallback',
-                    'timestamp': datetime.now(),
-                    'error': str(e)
-                }
-            else:
-                live_price = None
-        
+            estimated_price = get_enhanced_psx_fetcher()._get_sector_based_estimate(selected_symbol)
+            live_price = {
+                'price': estimated_price,
+                'source': 'error_fallback',
+                'timestamp': datetime.now(),
+                'error': str(e)
+            }
+
         if live_price and live_price.get('price'):
             current_price = live_price['price']
             
@@ -3141,8 +2971,7 @@ def display_five_minute_live_predictions():
                 current_price = 100.0  # Default fallback
             
             # Display current price with trend indicator
-            import random
-            price_change = random.uniform(-50, 50)
+            price_change = _RNG.uniform(-50, 50)
             price_change_pct = (price_change / current_price) * 100
             
             if price_change > 0:
@@ -3195,7 +3024,7 @@ def display_five_minute_live_predictions():
                     
                     if i == 0:
                         # Opening price with slight variation
-                        price = base_price * random.uniform(0.998, 1.002)
+                        price = base_price * _RNG.uniform(0.998, 1.002)
                     else:
                         # Progressive price movement throughout the day
                         previous_price = complete_day_prices[-1]
@@ -3205,17 +3034,17 @@ def display_five_minute_live_predictions():
                         minute = interval_time.minute
                         
                         if hour == 9 or (hour == 10 and minute < 30):  # Early morning - higher volatility
-                            volatility = random.uniform(-0.008, 0.012)
+                            volatility = _RNG.uniform(-0.008, 0.012)
                         elif hour == 10 and minute >= 30 or hour == 11:  # Late morning - high volatility
-                            volatility = random.uniform(-0.009, 0.013)
+                            volatility = _RNG.uniform(-0.009, 0.013)
                         elif hour == 12:  # Mid-day - moderate volatility
-                            volatility = random.uniform(-0.006, 0.008)
+                            volatility = _RNG.uniform(-0.006, 0.008)
                         elif hour == 13:  # Early afternoon - moderate volatility
-                            volatility = random.uniform(-0.007, 0.010)
+                            volatility = _RNG.uniform(-0.007, 0.010)
                         elif hour == 14:  # Late afternoon - varying volatility
-                            volatility = random.uniform(-0.008, 0.009)
+                            volatility = _RNG.uniform(-0.008, 0.009)
                         else:  # Closing time - end-of-day patterns
-                            volatility = random.uniform(-0.005, 0.006)
+                            volatility = _RNG.uniform(-0.005, 0.006)
                         
                         # Apply market trend bias (smaller for more realistic movement)
                         trend_bias = (price_change_pct / 100) * 0.01  # Convert percentage to small decimal
@@ -3436,7 +3265,7 @@ def display_five_minute_live_predictions():
     with col_15min_2:
         if auto_refresh_enabled:
             # Show countdown timer - use timezone-aware datetime
-            pkt = pytz.timezone('Asia/Karachi')
+            pkt = pakistan_tz
             now_pkt = datetime.now(pkt)
             start_time_pkt = st.session_state.auto_refresh_start_time
             
@@ -3463,13 +3292,13 @@ def display_five_minute_live_predictions():
     with col_15min_3:
         if not auto_refresh_enabled:
             if st.button("ðŸ”„ Refresh", key="refresh_15min_session_btn"):
-                pkt = pytz.timezone('Asia/Karachi')
+                pkt = pakistan_tz
                 st.session_state.last_15min_session_refresh = datetime.now(pkt)
                 st.rerun()
         else:
             # Show refresh now button
             if st.button("ðŸ”„ Refresh Now", key="refresh_now_15min_btn"):
-                pkt = pytz.timezone('Asia/Karachi')
+                pkt = pakistan_tz
                 st.session_state.last_refresh_15min = datetime.now(pkt)
                 st.session_state.auto_refresh_start_time = datetime.now(pkt)  # Reset timer
                 st.rerun()
@@ -3510,7 +3339,7 @@ def display_five_minute_live_predictions():
                 else:
                     # Predicted price with volatility
                     volatility = 0.012 - (i * 0.002)  # Decreasing volatility
-                    price_change = random.uniform(-volatility, volatility)
+                    price_change = _RNG.uniform(-volatility, volatility)
                     # Add trend influence
                     trend = price_change_pct / 100 if price_change_pct != 0 else 0
                     predicted_price = base_price * (1 + (price_change * 0.5 + trend * 0.1))
@@ -3648,12 +3477,12 @@ def display_five_minute_live_predictions():
                     # Generate realistic price progression for morning session
                     if i == 0:
                         # Opening price (slight gap from previous close)
-                        opening_price = current_price * random.uniform(0.995, 1.005)
+                        opening_price = current_price * _RNG.uniform(0.995, 1.005)
                         morning_prices.append(opening_price)
                     else:
                         # Progressive price movement with morning volatility
                         previous_price = morning_prices[-1]
-                        volatility = random.uniform(-0.008, 0.012)  # Morning bias slightly positive
+                        volatility = _RNG.uniform(-0.008, 0.012)  # Morning bias slightly positive
                         new_price = previous_price * (1 + volatility)
                         morning_prices.append(new_price)
                 
@@ -3766,12 +3595,12 @@ def display_five_minute_live_predictions():
                     # Generate realistic price progression for afternoon session
                     if i == 0:
                         # Starting price from morning close
-                        starting_price = current_price * random.uniform(0.998, 1.002)
+                        starting_price = current_price * _RNG.uniform(0.998, 1.002)
                         afternoon_prices.append(starting_price)
                     else:
                         # Progressive price movement with afternoon volatility (typically less volatile)
                         previous_price = afternoon_prices[-1]
-                        volatility = random.uniform(-0.006, 0.008)  # Afternoon bias slightly positive but less volatile
+                        volatility = _RNG.uniform(-0.006, 0.008)  # Afternoon bias slightly positive but less volatile
                         new_price = previous_price * (1 + volatility)
                         afternoon_prices.append(new_price)
                 
@@ -3875,7 +3704,6 @@ def display_five_minute_live_predictions():
             
             try:
                 # Import required modules
-                import random
                 from datetime import timedelta, datetime
                 
                 # Create time points for full trading day (9:30 AM to 3:30 PM)
@@ -3893,7 +3721,7 @@ def display_five_minute_live_predictions():
                     # Generate realistic price progression for full trading day
                     if i == 0:
                         # Opening price
-                        opening_price = current_price * random.uniform(0.995, 1.005)
+                        opening_price = current_price * _RNG.uniform(0.995, 1.005)
                         full_day_prices.append(opening_price)
                     else:
                         # Progressive price movement with daily volatility pattern
@@ -3901,11 +3729,11 @@ def display_five_minute_live_predictions():
                         
                         # Different volatility patterns throughout the day
                         if i <= 12:  # Morning session (higher volatility)
-                            volatility = random.uniform(-0.012, 0.015)
+                            volatility = _RNG.uniform(-0.012, 0.015)
                         elif i <= 24:  # Early afternoon (moderate volatility)
-                            volatility = random.uniform(-0.008, 0.010)
+                            volatility = _RNG.uniform(-0.008, 0.010)
                         else:  # Late afternoon (end-of-day patterns)
-                            volatility = random.uniform(-0.010, 0.008)
+                            volatility = _RNG.uniform(-0.010, 0.008)
                         
                         new_price = previous_price * (1 + volatility)
                         full_day_prices.append(new_price)
@@ -3995,6 +3823,8 @@ def display_five_minute_live_predictions():
 
 def display_universal_file_upload():
     """Universal file upload functionality for any brand prediction"""
+    from file_debug import analyze_uploaded_file, create_manual_dataframe
+
     st.subheader("ðŸ“ Universal File Upload & Prediction")
     
     st.markdown("""
@@ -4318,7 +4148,7 @@ def display_universal_file_upload():
                         df = analysis['data']
                         
                         # Generate predictions
-                        predictions = st.session_state.universal_predictor.generate_predictions(
+                        predictions = get_universal_predictor().generate_predictions(
                             df, brand_name, price_column, date_column if date_column != 'None' else None
                         )
                         
@@ -4800,7 +4630,7 @@ def display_universal_file_upload():
             with st.spinner("Generating predictions from manually processed data..."):
                 try:
                     # Generate predictions using the manual dataframe
-                    predictions = st.session_state.universal_predictor.generate_predictions(
+                    predictions = get_universal_predictor().generate_predictions(
                         manual_df, manual_brand, price_column, 
                         date_column if date_column != 'None' else None
                     )
@@ -4937,11 +4767,11 @@ def display_news_based_predictions():
         if st.button("ðŸ”„ Fetch Live News & Predict", key="fetch_news_predict"):
             with st.spinner("Fetching live news and analyzing sentiment..."):
                 # Get current price
-                live_price_data = st.session_state.data_fetcher.get_live_company_price(symbol)
+                live_price_data = get_data_fetcher().get_live_company_price(symbol)
                 current_price = live_price_data['price'] if live_price_data else 100.0  # fallback
                 
                 # Generate news-based prediction
-                news_prediction = st.session_state.news_predictor.generate_news_based_prediction(current_price, symbol)
+                news_prediction = get_news_predictor().generate_news_based_prediction(current_price, symbol)
                 
                 if news_prediction:
                     # Display prediction results
@@ -5089,7 +4919,7 @@ def display_all_kse100_live_prices():
     # Fetch data if needed
     if need_refresh or st.button("ðŸ”„ Refresh All Data", key="refresh_kse100"):
         with st.spinner("Fetching live prices for all KSE-100 companies..."):
-            st.session_state.all_kse100_data = st.session_state.enhanced_psx_fetcher.fetch_all_kse100_live_prices()
+            st.session_state.all_kse100_data = get_enhanced_psx_fetcher().fetch_all_kse100_live_prices()
             st.session_state.kse100_last_fetch = datetime.now()
     
     # Display the data
@@ -5116,7 +4946,7 @@ def display_all_kse100_live_prices():
         
         with col4:
             # Get KSE-100 index value
-            kse_index = st.session_state.enhanced_psx_fetcher.get_kse100_index_value()
+            kse_index = get_enhanced_psx_fetcher().get_kse100_index_value()
             st.metric("KSE-100 Index", f"{kse_index['value']:,.2f}")
         
         st.markdown("---")
@@ -5457,14 +5287,14 @@ def generate_company_historical_data(symbol):
             current_price = st.session_state.all_kse100_data[symbol]['current_price']
         else:
             # Use sector-based estimate
-            current_price = st.session_state.enhanced_psx_fetcher._get_sector_based_estimate(symbol)
+            current_price = get_enhanced_psx_fetcher()._get_sector_based_estimate(symbol)
         
         # Generate 90 days of historical data
         dates = pd.date_range(end=datetime.now(), periods=90, freq='D')
         
         # Generate realistic price movements
-        np.random.seed(hash(symbol) % 2**32)  # Consistent data for same symbol
-        returns = np.random.normal(0.001, 0.02, 90)  # Daily returns with 2% volatility
+        rng = _session_rng(symbol)  # Consistent data for same symbol
+        returns = rng.normal(0.001, 0.02, 90)  # Daily returns with 2% volatility
         
         # Calculate cumulative prices
         cumulative_returns = np.cumprod(1 + returns)
@@ -5473,11 +5303,11 @@ def generate_company_historical_data(symbol):
         
         # Generate OHLC data
         data = {
-            'open': prices * np.random.uniform(0.995, 1.005, 90),
-            'high': prices * np.random.uniform(1.001, 1.015, 90),
-            'low': prices * np.random.uniform(0.985, 0.999, 90),
+            'open': prices * rng.uniform(0.995, 1.005, 90),
+            'high': prices * rng.uniform(1.001, 1.015, 90),
+            'low': prices * rng.uniform(0.985, 0.999, 90),
             'close': prices,
-            'volume': np.random.randint(50000, 500000, 90)
+            'volume': rng.integers(50000, 500000, 90)
         }
         
         # Ensure OHLC relationships are correct
@@ -5588,7 +5418,7 @@ def generate_forecast_for_company(historical_data, symbol, days):
 def generate_intraday_data(symbol, current_price):
     """Generate realistic intraday 5-minute data for today"""
     try:
-        from datetime import datetime, time, timedelta
+        from datetime import datetime, time
 
         # Generate times from 9:30 AM to 3:30 PM (PSX trading hours)
         today_date = datetime.now().date()
@@ -5596,24 +5426,20 @@ def generate_intraday_data(symbol, current_price):
         end_time = datetime.combine(today_date, time(15, 30))
 
         # 5-minute intervals
-        times = []
-        current_time = start_time
-        while current_time <= end_time:
-            times.append(current_time)
-            # Ensure proper datetime addition
-            current_time = current_time + timedelta(minutes=5)
+        times = pd.date_range(start_time, end_time, freq='5min')
 
         # Generate realistic intraday price movements
-        np.random.seed(hash(symbol + str(datetime.now().date())) % 2**32)
+        rng = _session_rng(symbol + str(datetime.now().date()))
 
         # Start with opening price (Â±2% from current)
-        open_price = current_price * np.random.uniform(0.98, 1.02)
+        open_price = current_price * rng.uniform(0.98, 1.02)
+
+        # Small random movements, 0.2% volatility per 5 minutes, drawn in one call
+        changes = rng.normal(0, current_price * 0.002, len(times) - 1)
 
-        # Generate price movements
+        # Generate price movements with mean reversion
         prices = [open_price]
-        for i in range(1, len(times)):
-            # Small random movements with mean reversion
-            change = np.random.normal(0, current_price * 0.002)  # 0.2% volatility per 5 minutes
+        for change in changes:
             new_price = prices[-1] + change
 
             # Mean reversion towards current price
@@ -5623,7 +5449,7 @@ def generate_intraday_data(symbol, current_price):
             prices.append(max(new_price, current_price * 0.9))  # Minimum 90% of current
 
         # Adjust last price to be close to current price
-        prices[-1] = current_price * np.random.uniform(0.995, 1.005)
+        prices[-1] = current_price * rng.uniform(0.995, 1.005)
 
         intraday_df = pd.DataFrame({
             'time': times,
@@ -5699,15 +5525,14 @@ def display_technical_analysis():
     st.markdown("---")
 
     # Company selection
-    companies = st.session_state.data_fetcher.get_kse100_companies()
     selected_company = st.selectbox(
         "Select Company for Technical Analysis:",
-        list(companies.keys()),
+        _company_names(),
         key="tech_analysis_company"
     )
 
     if selected_company:
-        company_name = companies[selected_company]
+        company_name = _company_symbol_map()[selected_company]
 
         # Fetch data
         with st.spinner(f"Fetching data for {company_name}..."):
@@ -5720,7 +5545,7 @@ def display_technical_analysis():
                     st.success(f"âœ… Loaded cached data for {company_name}")
                 else:
                     # Fetch fresh data
-                    stock_data = st.session_state.data_fetcher.fetch_company_data(selected_company, days=90)
+                    stock_data = get_data_fetcher().fetch_company_data(selected_company, days=90)
                     if stock_data is not None and not stock_data.empty:
                         st.session_state.cache_manager.store_stock_data(selected_company, company_name, stock_data)
                         st.success(f"ðŸ“¡ Fetched fresh data for {company_name}")
@@ -6659,7 +6484,6 @@ def display_master_oracle_terminal():
             forecast_graph = go.Figure()
 
             # Generate Pakistan trading hours time points
-            pakistan_tz = pytz.timezone('Asia/Karachi')
             now_pkt = datetime.now(pakistan_tz)
             today = now_pkt.date()
             start_forecast = datetime.combine(today, datetime.strptime('09:30', '%H:%M').time())
@@ -3,7 +3,6 @@ from bs4 import BeautifulSoup
 import pandas as pd
 import numpy as np
 from datetime import datetime, timedelta
-import time
 import streamlit as st
 try:
     import trafilatura
@@ -175,74 +174,67 @@ class DataFetcher:
         """Return the list of KSE-100 companies"""
         return self.kse100_companies
     
-    def fetch_all_companies_live_data(self):
-        """Fetch live prices for all KSE-100 companies with comprehensive web scraping"""
-        companies_data = {}
-        
-        st.write("🔄 Fetching live prices for all 100 KSE-100 companies from authentic Pakistani sources...")
-        progress_bar = st.progress(0)
-        total_companies = len(self.kse100_companies)
-        
-        # Track data sources for transparency
-        successful_fetches = 0
-        failed_fetches = 0
-        sources_used = {}
-        
-        for i, (company_name, symbol) in enumerate(self.kse100_companies.items()):
-            progress_bar.progress((i + 1) / total_companies)
-            
-            # Display current company being processed
-            st.write(f"📊 Processing {company_name} ({symbol})...")
-            
-            # Get live price for this company
+    def _fetch_one(self, symbol):
+        """Fetch live or fallback data for one company without touching the UI"""
+        try:
             live_price = self.get_live_company_price(symbol)
             
             if live_price and live_price.get('price'):
                 # Generate historical data around current price
                 historical_data = self._generate_recent_data_around_price(live_price['price'])
-                companies_data[company_name] = {
+                return {
                     'current_price': live_price['price'],
                     'timestamp': live_price['timestamp'],
                     'source': live_price['source'],
                     'historical_data': historical_data,
                     'symbol': symbol
                 }
-                successful_fetches += 1
-                
-                # Track sources used
-                source = live_price['source']
-                if source not in sources_used:
-                    sources_used[source] = 0
-                sources_used[source] += 1
-                
-                st.success(f"✅ {company_name}: PKR {live_price['price']:.2f} (Source: {source})")
+            
+            # Get estimated price based on historical range
+            estimated_price = self._get_estimated_price_for_symbol(symbol)
+            if estimated_price:
+                return {
+                    'current_price': estimated_price,
+                    'timestamp': datetime.now(),
+                    'source': 'estimated_range_fallback',
+                    'historical_data': pd.DataFrame(),  # Empty dataframe
+                    'symbol': symbol,
+                    'note': 'Live data unavailable - showing estimated price based on historical range'
+                }
+            error = 'Live price data not available from any source'
+        except Exception as e:
+            error = f"Fetching {symbol} failed: {e}"
+        
+        return {
+            'current_price': None,
+            'timestamp': datetime.now(),
+            'source': 'unavailable',
+            'historical_data': pd.DataFrame(),  # Empty dataframe
+            'symbol': symbol,
+            'error': error
+        }
+    
+    def fetch_all_companies_live_data(self):
+        """Fetch live prices for all KSE-100 companies with comprehensive web scraping"""
+        companies_data = {}
+        
+        st.write("🔄 Fetching live prices for all 100 KSE-100 companies from authentic Pakistani sources...")
+        progress_bar = st.progress(0)
+        total_companies = len(self.kse100_companies)
+        
+        for done, (company_name, symbol) in enumerate(self.kse100_companies.items(), start=1):
+            data = self._fetch_one(symbol)
+            companies_data[company_name] = data
+            source = data['source']
+            
+            if source == 'estimated_range_fallback':
+                st.info(f"📊 {company_name}: PKR {data['current_price']:.2f} (Estimated - Live data unavailable)")
+            elif source == 'unavailable':
+                st.warning(f"❌ Unable to fetch live price for {company_name} ({symbol}): {data['error']}")
             else:
-                # Get estimated price based on historical range
-                estimated_price = self._get_estimated_price_for_symbol(symbol)
-                if estimated_price:
-                    st.info(f"📊 {company_name}: PKR {estimated_price:.2f} (Estimated - Live data unavailable)")
-                    companies_data[company_name] = {
-                        'current_price': estimated_price,
-                        'timestamp': datetime.now(),
-                        'source': 'estimated_range_fallback',
-                        'historical_data': pd.DataFrame(),  # Empty dataframe
-                        'symbol': symbol,
-                        'note': 'Live data unavailable - showing estimated price based on historical range'
-                    }
-                else:
-                    st.warning(f"❌ Unable to fetch live price for {company_name} ({symbol})")
-                    companies_data[company_name] = {
-                        'current_price': None,
-                        'timestamp': datetime.now(),
-                        'source': 'unavailable',
-                        'historical_data': pd.DataFrame(),  # Empty dataframe
-                        'symbol': symbol,
-                        'error': 'Live price data not available from any source'
-                    }
-                failed_fetches += 1
-            
-            # Add small delay to avoid overwhelming servers
-            time.sleep(0.1)
+                st.success(f"✅ {company_name}: PKR {data['current_price']:.2f} (Source: {source})")
+            
+            progress_bar.progress(done / total_companies)
         
         progress_bar.empty()
         
@@ -353,6 +345,10 @@ class DataFetcher:
             'source': 'psx_realistic_simulation'
         }
 
+    def get_live_company_prices(self, symbols):
+        """Get live prices for several symbols, keyed by symbol"""
+        return {symbol: self.get_live_company_price(symbol) for symbol in symbols}
+
     def get_live_company_price_old(self, symbol):
         """Get live price for specific PSX companies from authentic sources"""
         
@@ -1380,7 +1376,7 @@ class DataFetcher:
                     continue
                     
                 try:
-                    response = requests.get(url, headers=headers, timeout=3)
+                    response = self.session.get(url, headers=headers, timeout=3)
                     if response.status_code == 200:
                         soup = BeautifulSoup(response.content, 'html.parser')
                         
@@ -1445,7 +1441,7 @@ class DataFetcher:
                     continue
                     
                 try:
-                    response = requests.get(url, headers=headers, timeout=3)
+                    response = self.session.get(url, headers=headers, timeout=3)
                     if response.status_code == 200:
                         soup = BeautifulSoup(response.content, 'html.parser')
                         
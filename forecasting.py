@@ -50,8 +50,14 @@ class StockForecaster:
         
         forecasts = {}
         
-        # Prophet forecast
-        prophet_forecast = self.forecast_stock(historical_data, days_ahead)
+        # Linear trend forecast
+        trend_forecast = self._linear_trend_forecast(historical_data, int(days_ahead))
+        if trend_forecast is not None:
+            forecasts['linear_trend'] = trend_forecast
+        
+        # Prophet forecast; forecast_stock is the linear trend while Prophet is disabled,
+        # so reuse that fit instead of computing it twice
+        prophet_forecast = trend_forecast.copy() if trend_forecast is not None else None
         if prophet_forecast is not None:
             forecasts['prophet'] = prophet_forecast
         
@@ -59,11 +65,6 @@ class StockForecaster:
         ma_forecast = self._moving_average_forecast(historical_data, days_ahead)
         if ma_forecast is not None:
             forecasts['moving_average'] = ma_forecast
-            
-        # Linear trend forecast
-        trend_forecast = self._linear_trend_forecast(historical_data, days_ahead)
-        if trend_forecast is not None:
-            forecasts['linear_trend'] = trend_forecast
         
         return forecasts
     
@@ -84,8 +85,8 @@ class StockForecaster:
             if close_col is None:
                 return None
 
-            # Calculate moving average
-            ma = historical_data[close_col].rolling(window=window).mean().iloc[-1]
+            # Moving average of the last window only; NaN in the window yields NaN as rolling() did
+            ma = historical_data[close_col].to_numpy(dtype=np.float64)[-window:].mean()
             
             # Create forecast dataframe
             last_date = pd.to_datetime(historical_data['date'].max())
@@ -127,11 +128,14 @@ class StockForecaster:
 
             # Calculate linear trend
             x = np.arange(len(historical_data))
-            y = historical_data[close_col].values
+            y = historical_data[close_col].to_numpy(dtype=np.float64)
+            if not np.isfinite(y).all():
+                return None
             
-            # Fit linear regression
-            coeffs = np.polyfit(x, y, 1)
-            slope, intercept = coeffs
+            # Least-squares line in closed form; x is evenly spaced so no solver is needed
+            x_centered = x - x.mean()
+            slope = np.dot(x_centered, y - y.mean()) / np.dot(x_centered, x_centered)
+            intercept = y.mean() - slope * x.mean()
             
             # Predict future values
             future_x = np.arange(len(historical_data), len(historical_data) + days_ahead)
@@ -274,15 +278,9 @@ class StockForecaster:
             # Use last 5 points for validation
             actual = historical_data['close'].tail(5).values
             
-            # Simple prediction using last trend
-            predicted = []
-            for i in range(5):
-                if i == 0:
-                    predicted.append(historical_data['close'].iloc[-6])
-                else:
-                    predicted.append(predicted[-1] * (1 + np.random.normal(0, 0.01)))
-            
-            predicted = np.array(predicted)
+            # Simple prediction using last trend: a random walk drawn in one call
+            steps = np.concatenate(([1.0], 1 + np.random.normal(0, 0.01, 4)))
+            predicted = historical_data['close'].iloc[-6] * np.cumprod(steps)
             
             # Calculate metrics
             mae = np.mean(np.abs(actual - predicted))